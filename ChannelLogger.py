@@ -7,24 +7,32 @@
 def ChannelLogger():
     import json
     import asyncio
-    import requests
+    import aiohttp
     import discord
     from pathlib import Path
     from datetime import datetime
+    from contextlib import AsyncExitStack
+    from collections import OrderedDict, namedtuple, Counter, deque
     import os
     import re
     import time
     import calendar
+    import hashlib
+    import gzip
+    import io
+    import base64
+    import difflib
+    import sqlite3
 
     BASE_DIR = Path(getScriptsPath()) / "json"
     CONFIG_FILE = BASE_DIR / "ChannelLoggerConf.json"
 
-    _theme_cache = {"data": {}, "last_loaded": 0.0}
+    _theme_cache = {"data": {}, "last_loaded": None, "values": (0x5865F2, None, None), "version": 0}
     THEME_TTL = 60.0
 
     def load_theme():
         now = time.monotonic()
-        if now - _theme_cache["last_loaded"] < THEME_TTL and _theme_cache["data"]:
+        if _theme_cache["last_loaded"] is not None and now - _theme_cache["last_loaded"] < THEME_TTL:
             return _theme_cache["data"]
         try:
             nighty_config_path = Path(os.getenv("APPDATA")) / "Nighty Selfbot" / "nighty.config"
@@ -34,17 +42,23 @@ def ChannelLogger():
             theme_file = Path(os.getenv("APPDATA")) / "Nighty Selfbot" / "data" / "themes" / f"{theme_name}.json"
             with open(theme_file, "r", encoding="utf-8") as tf:
                 theme_data = json.load(tf)
+            color = int(theme_data.get("color", "5865F2").replace("#", ""), 16) if theme_data.get("color") else 0x5865F2
+            values = (color, theme_data.get("small_image"), theme_data.get("large_image"))
+            if values != _theme_cache["values"]:
+                _theme_cache["values"] = values
+                _theme_cache["version"] += 1
             _theme_cache["data"] = theme_data
             _theme_cache["last_loaded"] = now
             return theme_data
         except Exception as e:
+            # Failed loads wait out the TTL too, otherwise every logged event retries the disk read.
+            _theme_cache["last_loaded"] = now
             print(f"Channel Logger | Error loading theme: {e}", type_="ERROR")
-            return _theme_cache["data"] if _theme_cache["data"] else {}
+            return _theme_cache["data"]
 
     def get_theme_values():
-        theme = load_theme()
-        color = int(theme.get("color", "5865F2").replace("#", ""), 16) if theme.get("color") else 0x5865F2
-        return color, theme.get("small_image"), theme.get("large_image")
+        load_theme()
+        return _theme_cache["values"]
 
     def discord_ts(dt):
         unix = calendar.timegm(dt.timetuple())
@@ -85,7 +99,16 @@ def ChannelLogger():
                     cfg.pop(k, None)
             for key, default in [
                 ("log_on_send", True), ("log_deleted", True), ("log_edited", True),
-                ("log_embeds", True), ("log_attachments", True), ("log_bulk_deleted", True)
+                ("log_embeds", True), ("log_attachments", True), ("log_bulk_deleted", True),
+                ("batch_embeds", False), ("batch_window_ms", 500), ("batch_max_embeds", 10),
+                ("message_cache_mb", 32), ("upload_limit_mb", 10),
+                ("webhooks_per_destination", 1), ("shard_strategy", "least_loaded"),
+                ("digest_enabled", False), ("digest_threshold", 10), ("digest_interval", 10),
+                ("dedup_enabled", False), ("dedup_window", 30),
+                ("log_reactions", False), ("reaction_window", 30),
+                ("bulk_transcripts", True),
+                ("vault_enabled", False), ("vault_budget_mb", 256), ("vault_max_file_mb", 25),
+                ("local_sink_format", "jsonl"), ("local_retention_days", 30), ("local_retention_mb", 512)
             ]:
                 if key not in cfg:
                     cfg[key] = default
@@ -101,6 +124,7 @@ def ChannelLogger():
         try:
             with open(CONFIG_FILE, "w") as f:
                 json.dump(config, f, indent=4)
+            invalidate_routing()
             return True
         except Exception as e:
             print(f"Channel Logger | Error saving config: {e}", type_="ERROR")
@@ -110,30 +134,472 @@ def ChannelLogger():
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, lambda: func(*args, **kwargs))
 
-    def create_webhook(channel_id, webhook_name):
+    WEBHOOK_CONNECTIONS = 8
+    # Uploads can't outnumber the webhook POSTs that carry them, so this many slots never slows delivery down.
+    CDN_UPLOAD_SLOTS = WEBHOOK_CONNECTIONS
+    _http = {"session": None, "cdn": None, "cdn_slots": None}
+
+    async def get_http_session():
+        session = _http["session"]
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(ssl=False, limit_per_host=WEBHOOK_CONNECTIONS, keepalive_timeout=60, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=30))
+            _http["session"] = session
+        return session
+
+    async def get_cdn_session():
+        session = _http["cdn"]
+        if session is None or session.closed:
+            # Attachment downloads get their own pool, so CDN streams parked for an upload never starve the webhook POSTs.
+            # Sized so every upload slot can hold a full request's streams while the vault prefetches alongside.
+            connections = CDN_UPLOAD_SLOTS * MAX_FILES_PER_REQUEST + VAULT_CONCURRENCY
+            connector = aiohttp.TCPConnector(ssl=False, limit=connections, limit_per_host=connections, keepalive_timeout=60, ttl_dns_cache=300)
+            session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=None, connect=30, sock_connect=10, sock_read=30))
+            _http["cdn"] = session
+            _http["cdn_slots"] = asyncio.Semaphore(CDN_UPLOAD_SLOTS)
+        return session
+
+    async def close_http_session():
+        sessions = [_http["session"], _http["cdn"]]
+        _http["session"] = _http["cdn"] = None
+        for session in sessions:
+            if session and not session.closed:
+                await session.close()
+
+    async def create_webhook(channel_id, webhook_name):
         try:
+            session = await get_http_session()
             url = f"https://discord.com/api/v9/channels/{channel_id}/webhooks"
             headers = {"Authorization": bot.http.token, "Content-Type": "application/json"}
-            response = requests.post(url, headers=headers, json={"name": webhook_name}, timeout=10, verify=False)
-            response.raise_for_status()
-            data = response.json()
+            async with session.post(url, headers=headers, json={"name": webhook_name}, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                response.raise_for_status()
+                data = await response.json()
             return f"https://discord.com/api/webhooks/{data['id']}/{data['token']}", data['id'], data['token']
         except Exception as e:
             print(f"Channel Logger | Error creating webhook: {e}", type_="ERROR")
             return None, None, None
 
-    def validate_webhook(webhook_url):
+    async def validate_webhook(webhook_url):
         if not webhook_url:
             return False
         try:
-            return requests.get(webhook_url, timeout=10, verify=False).status_code == 200
+            session = await get_http_session()
+            async with session.get(webhook_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                return response.status == 200
         except Exception:
             return False
 
-    def send_webhook_message(webhook_url, content=None, embed_data=None, embeds=None, username=None, avatar_url=None, files=None):
-        if not webhook_url:
-            return False
+    async def delete_webhook(webhook_id, webhook_token):
+        try:
+            session = await get_http_session()
+            async with session.delete(f"https://discord.com/api/v9/webhooks/{webhook_id}/{webhook_token}", timeout=aiohttp.ClientTimeout(total=10)):
+                pass
+        except Exception as e:
+            print(f"Channel Logger | Error deleting webhook: {e}", type_="ERROR")
+
+    METRICS_FILE = BASE_DIR / "ChannelLoggerMetrics.json"
+    METRICS_UI_INTERVAL = 2.0
+    LATENCY_SUB_BITS = 4
+    LATENCY_SUB_BUCKETS = 1 << LATENCY_SUB_BITS
+    _metrics = {"since": time.time(), "events": {}, "sources": {}, "bytes_uploaded": 0, "downloads_failed": 0, "webhook_recreations": 0, "queue_peak": 0, "refreshed": 0.0}
+
+    def latency_bucket(micros):
+        # Log-linear buckets like HdrHistogram: 16 per power of two keeps every bucket within ~6% of its value.
+        if micros < LATENCY_SUB_BUCKETS:
+            return max(micros, 0)
+        shift = micros.bit_length() - LATENCY_SUB_BITS - 1
+        return shift * LATENCY_SUB_BUCKETS + (micros >> shift)
+
+    def bucket_upper(index):
+        if index < LATENCY_SUB_BUCKETS:
+            return index
+        shift = index // LATENCY_SUB_BUCKETS - 1
+        return ((index - shift * LATENCY_SUB_BUCKETS + 1) << shift) - 1
+
+    def histogram_percentile(histogram, fraction):
+        total = sum(histogram.values())
+        if not total:
+            return None
+        seen = 0
+        for index in sorted(histogram):
+            seen += histogram[index]
+            if seen >= total * fraction:
+                return bucket_upper(index)
+        return bucket_upper(max(histogram))
+
+    def merge_histograms(histograms):
+        merged = Counter()
+        for histogram in histograms:
+            merged.update(histogram)
+        return merged
+
+    def record_event_metrics(matched, event, received_at, ok):
+        key = (matched.get("type"), matched.get("id"))
+        per_source = _metrics["sources"].get(key)
+        if per_source is None:
+            per_source = _metrics["sources"][key] = {"source": matched, "events": {}}
+        per_source["source"] = matched
+        now = time.monotonic()
+        index = latency_bucket(int((now - received_at) * 1000000)) if ok else None
+        for events in (per_source["events"], _metrics["events"]):
+            stats = events.get(event)
+            if stats is None:
+                stats = events[event] = {"count": 0, "failed": 0, "latency": {}}
+            stats["count"] += 1
+            if index is None:
+                stats["failed"] += 1
+            else:
+                stats["latency"][index] = stats["latency"].get(index, 0) + 1
+        if now - _metrics["refreshed"] >= METRICS_UI_INTERVAL:
+            _metrics["refreshed"] = now
+            update_metrics_text()
+
+    def queue_depth():
+        return sum(queue.qsize() for queue in _delivery["queues"].values())
+
+    def event_stats_json(stats):
+        latency = stats["latency"]
+        return {
+            "count": stats["count"], "failed": stats["failed"],
+            "latency_us": {
+                "p50": histogram_percentile(latency, 0.5), "p90": histogram_percentile(latency, 0.9),
+                "p99": histogram_percentile(latency, 0.99), "max": bucket_upper(max(latency)) if latency else None
+            },
+            "histogram_us": {str(bucket_upper(index)): count for index, count in sorted(latency.items())}
+        }
+
+    def metrics_snapshot():
+        return {
+            "since": datetime.utcfromtimestamp(_metrics["since"]).isoformat() + "Z",
+            "taken": datetime.utcnow().isoformat() + "Z",
+            "bytes_uploaded": _metrics["bytes_uploaded"],
+            "downloads_failed": _metrics["downloads_failed"],
+            "webhook_recreations": _metrics["webhook_recreations"],
+            "queue_depth": queue_depth(),
+            "queue_peak": _metrics["queue_peak"],
+            "events": {event: event_stats_json(stats) for event, stats in _metrics["events"].items()},
+            "sources": [
+                {
+                    "type": stype, "id": sid, "label": source_label(per_source["source"]),
+                    "events": {event: event_stats_json(stats) for event, stats in per_source["events"].items()}
+                }
+                for (stype, sid), per_source in _metrics["sources"].items()
+            ]
+        }
+
+    def reset_metrics():
+        _metrics.update({"since": time.time(), "events": {}, "sources": {}, "bytes_uploaded": 0, "downloads_failed": 0, "webhook_recreations": 0, "queue_peak": 0})
+
+    _delivery = {"queues": {}, "workers": {}, "buckets": {}, "closing": False, "seq": 0}
+    URGENT_PRIORITY = 0
+    NORMAL_PRIORITY = 1
+    WORKER_IDLE_TIMEOUT = 60.0
+    MAX_RATE_LIMIT_RETRIES = 5
+    SERVER_ERROR_RETRIES = 2
+    SERVER_ERROR_BACKOFF = 1.0
+
+    def delivery_outcome(status):
+        if status is None:
+            kind = "closing"
+        elif status in (200, 204):
+            kind = "ok"
+        elif status in (401, 404):
+            kind = "gone"
+        elif status == 413:
+            kind = "too_large"
+        elif status == 429:
+            kind = "rate_limited"
+        elif status == 0:
+            kind = "network"
+        elif status >= 500:
+            kind = "server_error"
+        else:
+            kind = "client_error"
+        return {"ok": kind == "ok", "status": status, "kind": kind}
+
+    def merge_outcomes(outcomes):
+        return next((o for o in outcomes if not o["ok"]), outcomes[0] if outcomes else delivery_outcome(0))
+
+    def get_bucket(webhook_url):
+        bucket = _delivery["buckets"].get(webhook_url)
+        if bucket is None:
+            bucket = {"remaining": None, "reset_at": 0.0, "blocked_until": 0.0}
+            _delivery["buckets"][webhook_url] = bucket
+        return bucket
+
+    def bucket_delay(webhook_url):
+        bucket = get_bucket(webhook_url)
+        now = time.monotonic()
+        if bucket["blocked_until"] > now:
+            return bucket["blocked_until"] - now
+        if bucket["remaining"] == 0 and bucket["reset_at"] > now:
+            return bucket["reset_at"] - now
+        return 0.0
+
+    def update_bucket(webhook_url, status, headers, body):
+        bucket = get_bucket(webhook_url)
+        now = time.monotonic()
+        try:
+            if headers.get("X-RateLimit-Remaining") is not None:
+                bucket["remaining"] = int(headers["X-RateLimit-Remaining"])
+            if headers.get("X-RateLimit-Reset-After") is not None:
+                bucket["reset_at"] = now + float(headers["X-RateLimit-Reset-After"])
+        except ValueError:
+            pass
+        if status == 429:
+            retry_after = None
+            try:
+                retry_after = float(json.loads(body).get("retry_after"))
+            except Exception:
+                try:
+                    retry_after = float(headers.get("Retry-After"))
+                except (TypeError, ValueError):
+                    pass
+            if retry_after is None:
+                retry_after = max(bucket["reset_at"] - now, 1.0)
+            bucket["blocked_until"] = now + retry_after
+            bucket["remaining"] = 0
+
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def attachment_file(filename, url, size=None):
+        return {"filename": filename, "url": url, "size": size}
+
+    def attachment_data(filename, data):
+        return {"filename": filename, "data": data, "size": len(data)}
+
+    def spoolable_file(spec):
+        if spec.get("data") is None:
+            return spec
+        return {"filename": spec["filename"], "size": spec["size"], "data_b64": base64.b64encode(spec["data"]).decode("ascii")}
+
+    async def stream_body(response):
+        async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+            _metrics["bytes_uploaded"] += len(chunk)
+            yield chunk
+
+    async def open_file_stream(session, spec, stack):
+        if spec.get("data") is not None:
+            _metrics["bytes_uploaded"] += len(spec["data"])
+            return spec["data"]
+        if spec.get("data_b64"):
+            data = base64.b64decode(spec["data_b64"])
+            _metrics["bytes_uploaded"] += len(data)
+            return data
+        if spec.get("path"):
+            # aiohttp reads file payloads in its executor, so the upload never blocks the loop on disk.
+            try:
+                handle = open(spec["path"], "rb")
+            except OSError as e:
+                # Evicted after the log was planned; the CDN copy may still be live.
+                if not spec.get("url"):
+                    print(f"Channel Logger | Vault file missing: {e}", type_="ERROR")
+                    return None
+            else:
+                stack.callback(handle.close)
+                touch_vault_file(spec["path"])
+                _metrics["bytes_uploaded"] += spec.get("size") or 0
+                return handle
+        try:
+            response = await stack.enter_async_context(session.get(spec["url"]))
+            response.raise_for_status()
+            return stream_body(response)
+        except Exception as e:
+            _metrics["downloads_failed"] += 1
+            print(f"Channel Logger | Attachment download failed: {e}", type_="ERROR")
+            return None
+
+    JSON_HEADERS = {"Content-Type": "application/json"}
 
+    async def post_webhook(webhook_url, payload, files=None, options=None):
+        options = options or {}
+        params = {"wait": "true"} if options.get("wait") else None
+        body = json.dumps(payload)
+        _metrics["bytes_uploaded"] += len(body)
+        try:
+            session = await get_http_session()
+            if files:
+                # CDN bodies are piped chunk by chunk into the multipart upload; nothing is buffered whole or written to disk.
+                async with AsyncExitStack() as stack:
+                    form = aiohttp.FormData()
+                    index = 0
+                    cdn = await get_cdn_session()
+                    if any(spec.get("data") is None and not spec.get("data_b64") for spec in files):
+                        # The slot is held until the POST ends, so the streams it opens always find free pooled connections.
+                        await stack.enter_async_context(_http["cdn_slots"])
+                    for spec in files:
+                        body_stream = await open_file_stream(cdn, spec, stack)
+                        if body_stream is None:
+                            continue
+                        form.add_field(f"files[{index}]", body_stream, filename=spec["filename"], content_type="application/octet-stream")
+                        index += 1
+                    form.add_field("payload_json", body, content_type="application/json")
+                    async with session.post(webhook_url, data=form, timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)) as response:
+                        status, headers = response.status, response.headers
+                        body = await response.text() if status >= 400 else ""
+            elif options.get("message_id"):
+                async with session.patch(f"{webhook_url}/messages/{options['message_id']}", data=body, headers=JSON_HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    status, headers = response.status, response.headers
+                    body = await response.text() if status >= 400 else ""
+            else:
+                async with session.post(webhook_url, data=body, headers=JSON_HEADERS, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                    status, headers = response.status, response.headers
+                    body = await response.text() if status >= 400 or params else ""
+            update_bucket(webhook_url, status, headers, body)
+            if status >= 400 and status != 429:
+                print(f"Channel Logger | Webhook error: {status} {body[:200]}", type_="ERROR")
+            message_id = None
+            if params and status == 200:
+                try:
+                    message_id = json.loads(body).get("id")
+                except ValueError:
+                    pass
+            return status, message_id
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Channel Logger | Webhook error: {e}", type_="ERROR")
+            return 0, None
+
+    async def delivery_worker(webhook_url):
+        queue = _delivery["queues"][webhook_url]
+        try:
+            while True:
+                try:
+                    _, _, payload, files, options, future = await asyncio.wait_for(queue.get(), WORKER_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                status = 0
+                message_id = None
+                server_retries = 0
+                try:
+                    for _ in range(MAX_RATE_LIMIT_RETRIES):
+                        delay = bucket_delay(webhook_url)
+                        if delay > 0:
+                            await asyncio.sleep(delay)
+                        status, message_id = await post_webhook(webhook_url, payload, files, options)
+                        if status == 429:
+                            continue
+                        if (status == 0 or status >= 500) and server_retries < SERVER_ERROR_RETRIES:
+                            server_retries += 1
+                            await asyncio.sleep(SERVER_ERROR_BACKOFF * 2 ** (server_retries - 1))
+                            continue
+                        break
+                    if status == 429:
+                        print("Channel Logger | Webhook still rate limited, giving up on message.", type_="ERROR")
+                finally:
+                    if not future.done():
+                        outcome = delivery_outcome(status)
+                        if message_id:
+                            outcome["message_id"] = message_id
+                        future.set_result(outcome)
+        finally:
+            _delivery["workers"].pop(webhook_url, None)
+            if not queue.empty():
+                ensure_delivery_worker(webhook_url)
+
+    def ensure_delivery_worker(webhook_url):
+        worker = _delivery["workers"].get(webhook_url)
+        if (worker is None or worker.done()) and not _delivery["closing"]:
+            _delivery["workers"][webhook_url] = asyncio.get_event_loop().create_task(delivery_worker(webhook_url))
+
+    EMBED_CHAR_BUDGET = 6000
+    MAX_EMBEDS_PER_REQUEST = 10
+    MAX_FILES_PER_REQUEST = 10
+    MAX_CONTENT_LENGTH = 2000
+    DEFAULT_UPLOAD_LIMIT_MB = 10
+
+    def _clip(text, limit):
+        if not isinstance(text, str) or len(text) <= limit:
+            return text
+        return text[:limit - 1] + "…"
+
+    def clamp_embed(embed):
+        embed = dict(embed)
+        if "title" in embed:
+            embed["title"] = _clip(embed["title"], 256)
+        if "description" in embed:
+            embed["description"] = _clip(embed["description"], 4096)
+        if embed.get("author"):
+            embed["author"] = dict(embed["author"], name=_clip(embed["author"].get("name"), 256))
+        if embed.get("footer"):
+            embed["footer"] = dict(embed["footer"], text=_clip(embed["footer"].get("text"), 2048))
+        if embed.get("fields"):
+            embed["fields"] = [
+                dict(f, name=_clip(f.get("name"), 256) or "\u200b", value=_clip(f.get("value"), 1024) or "\u200b")
+                for f in embed["fields"][:25]
+            ]
+        # A single embed may still exceed the total budget on its own; trim the description to fit.
+        overflow = embed_char_count(embed) - EMBED_CHAR_BUDGET
+        if overflow > 0 and embed.get("description"):
+            embed["description"] = _clip(embed["description"], max(len(embed["description"]) - overflow, 1))
+        return embed
+
+    def embed_char_count(embed):
+        total = len(embed.get("title") or "") + len(embed.get("description") or "")
+        total += len((embed.get("author") or {}).get("name") or "")
+        total += len((embed.get("footer") or {}).get("text") or "")
+        for field in embed.get("fields") or []:
+            total += len(field.get("name") or "") + len(field.get("value") or "")
+        return total
+
+    def pack_content(lines):
+        chunks, current = [], ""
+        for line in lines:
+            line = _clip(line, MAX_CONTENT_LENGTH)
+            if current and len(current) + 1 + len(line) > MAX_CONTENT_LENGTH:
+                chunks.append(current)
+                current = line
+            else:
+                current = f"{current}\n{line}" if current else line
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def plan_requests(content, embeds, files, upload_limit):
+        parts = []
+        current = {"embeds": [], "chars": 0}
+        for embed in embeds:
+            embed = clamp_embed(embed)
+            chars = embed_char_count(embed)
+            if current["embeds"] and (len(current["embeds"]) >= MAX_EMBEDS_PER_REQUEST or current["chars"] + chars > EMBED_CHAR_BUDGET):
+                parts.append({"content": None, "embeds": current["embeds"], "files": [], "bytes": 0})
+                current = {"embeds": [], "chars": 0}
+            current["embeds"].append(embed)
+            current["chars"] += chars
+        if current["embeds"]:
+            parts.append({"content": None, "embeds": current["embeds"], "files": [], "bytes": 0})
+
+        oversized = [f for f in files if (f.get("size") or 0) > upload_limit]
+        uploadable = [f for f in files if (f.get("size") or 0) <= upload_limit]
+        # First-fit decreasing keeps the request count minimal and the split deterministic.
+        bins = parts[:] if parts else []
+        for spec in sorted(uploadable, key=lambda f: -(f.get("size") or 0)):
+            size = spec.get("size") or 0
+            target = next((p for p in bins if len(p["files"]) < MAX_FILES_PER_REQUEST and p["bytes"] + size <= upload_limit), None)
+            if target is None:
+                target = {"content": None, "embeds": [], "files": [], "bytes": 0}
+                bins.append(target)
+            target["files"].append(spec)
+            target["bytes"] += size
+        parts = bins
+
+        lines = [content] if content else []
+        for spec in oversized:
+            size_mb = (spec.get("size") or 0) / (1024 * 1024)
+            if spec.get("url"):
+                lines.append(f"Attachment too large to upload ({size_mb:.1f} MB): [{spec['filename']}]({spec['url']})")
+            else:
+                lines.append(f"Attachment too large to upload ({size_mb:.1f} MB): {spec['filename']}")
+        chunks = pack_content(lines)
+        if chunks:
+            if parts:
+                parts[0]["content"] = chunks[0]
+            else:
+                parts.append({"content": chunks[0], "embeds": [], "files": [], "bytes": 0})
+            parts.extend({"content": c, "embeds": [], "files": [], "bytes": 0} for c in chunks[1:])
+        return parts
+
+    def enqueue_webhook_message(webhook_url, content=None, embed_data=None, embeds=None, username=None, avatar_url=None, files=None, priority=NORMAL_PRIORITY, options=None):
+        flush_batches(webhook_url)
         payload = {}
         if content:
             payload["content"] = content
@@ -149,69 +615,813 @@ def ChannelLogger():
         if avatar_url:
             payload["avatar_url"] = avatar_url
 
+        queue = _delivery["queues"].get(webhook_url)
+        if queue is None:
+            queue = asyncio.PriorityQueue()
+            _delivery["queues"][webhook_url] = queue
+        future = asyncio.get_event_loop().create_future()
+        if _delivery["closing"]:
+            future.set_result(delivery_outcome(None))
+            return future
+        # The sequence number keeps FIFO order within a priority level.
+        _delivery["seq"] += 1
+        queue.put_nowait((priority, _delivery["seq"], payload, files, options, future))
+        if queue.qsize() > _metrics["queue_peak"]:
+            _metrics["queue_peak"] = queue.qsize()
+        ensure_delivery_worker(webhook_url)
+        return future
+
+    MIN_UPLOAD_LIMIT = 1024 * 1024
+
+    async def send_planned(webhook_url, content, embeds, files, username, avatar_url, upload_limit, priority=NORMAL_PRIORITY):
+        parts = plan_requests(content, embeds, files, upload_limit)
+        if not parts:
+            return delivery_outcome(0)
+        deliveries = [
+            enqueue_webhook_message(webhook_url, part["content"], None, part["embeds"] or None, username, avatar_url, part["files"] or None, priority)
+            for part in parts
+        ]
+        outcomes = list(await asyncio.gather(*deliveries))
+        # A 413 means the real cap is lower than configured; re-plan that part against half the budget.
+        for i, (part, outcome) in enumerate(zip(parts, outcomes)):
+            if outcome["kind"] == "too_large" and part["files"] and upload_limit // 2 >= MIN_UPLOAD_LIMIT:
+                outcomes[i] = await send_planned(webhook_url, part["content"], part["embeds"], part["files"], username, avatar_url, upload_limit // 2, priority)
+        return merge_outcomes(outcomes)
+
+    async def send_webhook_message(webhook_url, content=None, embed_data=None, embeds=None, username=None, avatar_url=None, files=None, priority=NORMAL_PRIORITY):
+        if not webhook_url:
+            return delivery_outcome(0)
+        all_embeds = ([embed_data] if embed_data else []) + list(embeds or [])
+        upload_limit = max(int(get_routing()["config"].get("upload_limit_mb", DEFAULT_UPLOAD_LIMIT_MB)), 1) * 1024 * 1024
+        return await send_planned(webhook_url, content, all_embeds, list(files or []), username, avatar_url, upload_limit, priority)
+
+    _batches = {}
+    _batch_stats = {"requests_saved": 0}
+
+    def flush_batch(key):
+        batch = _batches.pop(key, None)
+        if not batch:
+            return
+        batch["timer"].cancel()
+        webhook_url, content, username, avatar_url = key
+        _batch_stats["requests_saved"] += batch["entries"] - 1
+        delivery = enqueue_webhook_message(webhook_url, content=content, embeds=batch["embeds"], username=username, avatar_url=avatar_url)
+        delivery.add_done_callback(lambda f: batch["future"].done() or batch["future"].set_result(f.result()))
+
+    def flush_batches(webhook_url):
+        for key in [k for k in _batches if k[0] == webhook_url]:
+            flush_batch(key)
+
+    async def send_batched_embeds(webhook_url, config, content=None, embed_data=None, embeds=None, username=None, avatar_url=None):
+        group = [clamp_embed(e) for e in ([embed_data] if embed_data else []) + list(embeds or [])]
+        max_embeds = min(max(int(config.get("batch_max_embeds", 10)), 1), 10)
+        chars = sum(embed_char_count(e) for e in group)
+        if not webhook_url or len(group) >= max_embeds or chars > EMBED_CHAR_BUDGET:
+            return await send_webhook_message(webhook_url, content=content, embeds=group, username=username, avatar_url=avatar_url)
+
+        key = (webhook_url, content, username, avatar_url)
+        batch = _batches.get(key)
+        if batch and (len(batch["embeds"]) + len(group) > max_embeds or batch["chars"] + chars > EMBED_CHAR_BUDGET):
+            flush_batch(key)
+            batch = None
+        if batch is None:
+            loop = asyncio.get_event_loop()
+            window = min(max(int(config.get("batch_window_ms", 500)), 100), 5000) / 1000
+            batch = {"embeds": [], "chars": 0, "entries": 0, "future": loop.create_future(), "timer": loop.call_later(window, flush_batch, key)}
+            _batches[key] = batch
+        batch["embeds"].extend(group)
+        batch["chars"] += chars
+        batch["entries"] += 1
+        future = batch["future"]
+        if len(batch["embeds"]) >= max_embeds:
+            flush_batch(key)
+        return await future
+
+    async def deliver_log(webhook_url, config, content=None, embed_data=None, embeds=None, username=None, avatar_url=None, files=None):
+        if config.get("batch_embeds", False) and not files:
+            return await send_batched_embeds(webhook_url, config, content, embed_data, embeds, username, avatar_url)
+        return await send_webhook_message(webhook_url, content, embed_data, embeds, username, avatar_url, files)
+
+    _recreations = {"tasks": {}, "failed_at": {}}
+    RECREATE_RETRY_COOLDOWN = 30.0
+
+    def webhook_pool(source):
+        pool = [source["webhook_url"]] if source.get("webhook_url") else []
+        pool.extend(w["webhook_url"] for w in source.get("webhook_pool", []) if w.get("webhook_url"))
+        return pool
+
+    def replace_pooled_webhook(source, old_url, replacement):
+        pooled = [w for w in source.get("webhook_pool", []) if w.get("webhook_url") == old_url]
+        for w in pooled:
+            w.update(replacement)
+        return bool(pooled)
+
+    async def _recreate_destination_webhook(dest_id, old_url):
+        new_url, new_id, new_token = await create_webhook(dest_id, "Channel Logger")
+        if not new_url:
+            _recreations["failed_at"][dest_id] = time.monotonic()
+            return None
+        _recreations["failed_at"].pop(dest_id, None)
+        _metrics["webhook_recreations"] += 1
+        replacement = {"webhook_url": new_url, "webhook_id": new_id, "webhook_token": new_token}
+        cfg = load_config()
+        for s in cfg.get("sources", []):
+            if replace_pooled_webhook(s, old_url, replacement):
+                continue
+            if s.get("destination_channel_id") == dest_id or s.get("webhook_url") == old_url:
+                s.update(replacement)
+        save_config(cfg)
+        print(f"Channel Logger | Recreated webhook for destination {dest_id}.", type_="INFO")
+        return replacement
+
+    async def recreate_webhook(matched, old_url=None):
+        dest_id = matched.get("destination_channel_id")
+        old_url = old_url or matched.get("webhook_url")
+        if not dest_id:
+            return None
+        # A concurrent send may already have replaced this webhook.
+        for s in get_routing()["config"].get("sources", []):
+            if s.get("destination_channel_id") == dest_id and s.get("webhook_url") and old_url not in webhook_pool(s):
+                matched.update({"webhook_url": s["webhook_url"], "webhook_id": s.get("webhook_id"), "webhook_token": s.get("webhook_token"), "webhook_pool": s.get("webhook_pool", [])})
+                return s["webhook_url"]
+
+        # Single flight: every failing send on this webhook awaits the same recreation.
+        key = (dest_id, old_url)
+        task = _recreations["tasks"].get(key)
+        if task is None:
+            if time.monotonic() - _recreations["failed_at"].get(dest_id, float("-inf")) < RECREATE_RETRY_COOLDOWN:
+                return None
+            task = asyncio.get_event_loop().create_task(_recreate_destination_webhook(dest_id, old_url))
+            _recreations["tasks"][key] = task
+            task.add_done_callback(lambda _: _recreations["tasks"].pop(key, None))
+        result = await asyncio.shield(task)
+        if not result:
+            return None
+        if not replace_pooled_webhook(matched, old_url, result):
+            matched.update(result)
+        return result["webhook_url"]
+
+    MAX_WEBHOOKS_PER_DESTINATION = 10
+    _shards = {"assigned": {}, "inflight": {}, "cursor": {}}
+
+    def pick_webhook(matched, order_key, strategy):
+        pool = webhook_pool(matched)
+        if len(pool) <= 1 or order_key is None:
+            return matched.get("webhook_url")
+        dest_id = matched.get("destination_channel_id")
+        key = (dest_id, order_key)
+        current = _shards["assigned"].get(key)
+        # A source channel stays on one webhook while it has sends in flight, so that webhook's FIFO queue keeps its order.
+        if current in pool and _shards["inflight"].get(key):
+            return current
+        if strategy == "round_robin":
+            cursor = _shards["cursor"].get(dest_id, 0)
+            chosen = pool[cursor % len(pool)]
+            _shards["cursor"][dest_id] = cursor + 1
+        else:
+            queues = _delivery["queues"]
+            chosen = min(pool, key=lambda url: (bucket_delay(url), queues[url].qsize() if url in queues else 0))
+        _shards["assigned"][key] = chosen
+        return chosen
+
+    def begin_shard_send(matched, order_key):
+        key = (matched.get("destination_channel_id"), order_key)
+        _shards["inflight"][key] = _shards["inflight"].get(key, 0) + 1
+        return key
+
+    def end_shard_send(key):
+        remaining = _shards["inflight"].get(key, 1) - 1
+        if remaining > 0:
+            _shards["inflight"][key] = remaining
+        else:
+            _shards["inflight"].pop(key, None)
+            _shards["assigned"].pop(key, None)
+
+    _breakers = {}
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 30.0
+    BREAKER_MAX_COOLDOWN = 600.0
+
+    def breaker_allows(dest_id):
+        breaker = _breakers.get(dest_id)
+        return not breaker or breaker["open_until"] <= time.monotonic()
+
+    def record_delivery(dest_id, outcome):
+        if outcome["kind"] == "closing":
+            return
+        breaker = _breakers.setdefault(dest_id, {"failures": 0, "open_until": 0.0, "cooldown": BREAKER_COOLDOWN, "last_status": None})
+        was_open = breaker["failures"] >= BREAKER_THRESHOLD
+        breaker["last_status"] = outcome["status"]
+        if outcome["ok"]:
+            breaker.update({"failures": 0, "open_until": 0.0, "cooldown": BREAKER_COOLDOWN})
+            if was_open:
+                print(f"Channel Logger | Destination {dest_id} recovered, circuit closed.", type_="INFO")
+                update_source_health()
+            return
+        breaker["failures"] += 1
+        if breaker["failures"] >= BREAKER_THRESHOLD:
+            # Half-open trial failed (or threshold just reached): open again with a longer cooldown.
+            if was_open:
+                breaker["cooldown"] = min(breaker["cooldown"] * 2, BREAKER_MAX_COOLDOWN)
+            breaker["open_until"] = time.monotonic() + breaker["cooldown"]
+            print(f"Channel Logger | Destination {dest_id} failing ({outcome['kind']}), circuit open for {int(breaker['cooldown'])}s.", type_="ERROR")
+        update_source_health()
+
+    def breaker_label(dest_id):
+        breaker = _breakers.get(dest_id)
+        if not breaker or not breaker["failures"]:
+            return ""
+        remaining = breaker["open_until"] - time.monotonic()
+        if remaining > 0:
+            return f"  [circuit open, retry in {int(remaining)}s, last {breaker['last_status']}]"
+        if breaker["failures"] >= BREAKER_THRESHOLD:
+            return "  [circuit half-open]"
+        return f"  [{breaker['failures']} recent failures]"
+
+    async def deliver_to_source(matched, config, content=None, embed_data=None, embeds=None, username=None, avatar_url=None, files=None, batch=False, order_key=None, urgent=False, event=None, received_at=None):
+        webhook_url = pick_webhook(matched, order_key, config.get("shard_strategy", "least_loaded"))
+        dest_id = matched.get("destination_channel_id")
+        shard_key = begin_shard_send(matched, order_key)
         try:
-            if files:
-                multipart_files = []
-                opened_files = []
-                try:
-                    for i, (file_path, file_name) in enumerate(files):
-                        f = open(file_path, "rb")
-                        opened_files.append(f)
-                        multipart_files.append((f"files[{i}]", (file_name, f)))
-                    multipart_files.append(("payload_json", (None, json.dumps(payload), "application/json")))
-                    response = requests.post(
-                        webhook_url,
-                        files=multipart_files,
-                        timeout=30,
-                        verify=False
-                    )
-                finally:
-                    for f in opened_files:
-                        try:
-                            f.close()
-                        except Exception:
-                            pass
+            if not breaker_allows(dest_id):
+                outcome = {"ok": False, "status": None, "kind": "circuit_open"}
+            elif batch and not urgent:
+                outcome = await deliver_log(webhook_url, config, content, embed_data, embeds, username, avatar_url, files)
             else:
-                response = requests.post(
-                    webhook_url,
-                    headers={"Content-Type": "application/json"},
-                    data=json.dumps(payload),
-                    timeout=10,
-                    verify=False
-                )
-            response.raise_for_status()
-            return response.status_code in (200, 204)
-        except requests.exceptions.RequestException as e:
-            print(f"Channel Logger | Webhook error: {e}", type_="ERROR")
-            return False
+                outcome = await send_webhook_message(webhook_url, content, embed_data, embeds, username, avatar_url, files, URGENT_PRIORITY if urgent else NORMAL_PRIORITY)
 
-    async def download_attachment(att):
+            # Only a vanished or revoked webhook warrants a new one; throttling and outages are retried from the spool.
+            if outcome["kind"] == "gone" and not _delivery["closing"]:
+                print("Channel Logger | Webhook is gone, attempting to recreate...", type_="ERROR")
+                new_url = await recreate_webhook(matched, webhook_url)
+                if new_url:
+                    outcome = await send_webhook_message(new_url, content, embed_data, embeds, username, avatar_url, files, URGENT_PRIORITY if urgent else NORMAL_PRIORITY)
+                else:
+                    print("Channel Logger | Could not recreate webhook.", type_="ERROR")
+        finally:
+            end_shard_send(shard_key)
+        if outcome["kind"] != "circuit_open":
+            record_delivery(dest_id, outcome)
+        if event:
+            record_event_metrics(matched, event, received_at, outcome["ok"])
+        if not outcome["ok"]:
+            spool_delivery(dest_id, {
+                "content": content,
+                "embeds": ([embed_data] if embed_data else []) + list(embeds or []),
+                "username": username,
+                "avatar_url": avatar_url,
+                "files": [spoolable_file(f) for f in files or [] if f.get("url") or f.get("path") or f.get("data") is not None]
+            })
+        return outcome["ok"]
+
+    SPOOL_DIR = BASE_DIR / "ChannelLoggerSpool"
+    SPOOL_SEGMENT_BYTES = 1024 * 1024
+    SPOOL_FSYNC_BATCH = 50
+    SPOOL_FSYNC_DELAY = 1.0
+    SPOOL_DRAIN_INTERVAL = 5.0
+    SPOOL_BACKOFF_BASE = 5.0
+    SPOOL_BACKOFF_MAX = 600.0
+    SPOOL_HANDOFF_WAIT = 30.0
+    _spool = {
+        "buffer": [], "active": None, "active_bytes": 0, "lock": asyncio.Lock(), "flush_handle": None,
+        "pending": 0, "spooled": 0, "drained": 0, "backoff": {}, "next_attempt": {}, "drainer": None,
+        "instance": os.urandom(4).hex()
+    }
+
+    def spool_segment_path(index):
+        # Segments carry the writing instance's id, so an instance shutting down during a reload never appends to a file the new one drains.
+        return SPOOL_DIR / f"segment-{index:06d}-{_spool['instance']}.jsonl"
+
+    def list_spool_segments():
+        segments = []
+        for path in SPOOL_DIR.glob("segment-*.jsonl"):
+            try:
+                segments.append((int(path.stem.split("-")[1]), path.name, path))
+            except (IndexError, ValueError):
+                pass
+        return [(index, path) for index, _, path in sorted(segments)]
+
+    def next_spool_index():
+        segments = list_spool_segments()
+        return segments[-1][0] + 1 if segments else 0
+
+    def read_spool_segment(path):
+        records = []
         try:
-            loop = asyncio.get_event_loop()
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass  # torn tail from a crash mid-write
+        except FileNotFoundError:
+            pass
+        return records
+
+    def append_spool_lines(path, lines):
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
 
-            def _fetch():
-                r = requests.get(att.url, timeout=20, verify=False)
-                r.raise_for_status()
-                return r.content
-
-            data = await loop.run_in_executor(None, _fetch)
-            temp_dir = Path(getScriptsPath()) / "tmp"
-            temp_dir.mkdir(parents=True, exist_ok=True)
-            safe_name = f"{att.id}_{att.filename}"
-            file_path = temp_dir / safe_name
-            with open(file_path, "wb") as f:
-                f.write(data)
-            return str(file_path), att.filename
+    def rewrite_spool_segment(path, records):
+        if not records:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r) + "\n" for r in records))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def spool_delivery(dest_id, message):
+        if not dest_id:
+            return
+        _spool["buffer"].append({"id": os.urandom(8).hex(), "dest": dest_id, "message": message, "spooled_at": time.time()})
+        _spool["pending"] += 1
+        _spool["spooled"] += 1
+        loop = asyncio.get_event_loop()
+        if len(_spool["buffer"]) >= SPOOL_FSYNC_BATCH:
+            loop.create_task(flush_spool())
+        elif _spool["flush_handle"] is None:
+            _spool["flush_handle"] = loop.call_later(SPOOL_FSYNC_DELAY, lambda: loop.create_task(flush_spool()))
+
+    async def flush_spool():
+        async with _spool["lock"]:
+            await _flush_spool_locked()
+
+    async def _flush_spool_locked():
+        if _spool["flush_handle"] is not None:
+            _spool["flush_handle"].cancel()
+            _spool["flush_handle"] = None
+        if not _spool["buffer"]:
+            return
+        lines = [json.dumps(r) + "\n" for r in _spool["buffer"]]
+        _spool["buffer"] = []
+        try:
+            await run_in_thread(SPOOL_DIR.mkdir, parents=True, exist_ok=True)
+            if _spool["active"] is None:
+                _spool["active"] = await run_in_thread(next_spool_index)
+            await run_in_thread(append_spool_lines, spool_segment_path(_spool["active"]), lines)
+            _spool["active_bytes"] += sum(len(line) for line in lines)
+            if _spool["active_bytes"] >= SPOOL_SEGMENT_BYTES:
+                _spool["active"] += 1
+                _spool["active_bytes"] = 0
         except Exception as e:
-            print(f"Channel Logger | Attachment download failed: {e}", type_="ERROR")
-            return None, None
+            print(f"Channel Logger | Spool write failed: {e}", type_="ERROR")
+
+    def current_source_for(dest_id):
+        for source in get_routing()["config"].get("sources", []):
+            if source.get("destination_channel_id") == dest_id and source.get("webhook_url"):
+                return source
+        return None
+
+    async def drain_spool():
+        async with _spool["lock"]:
+            await _flush_spool_locked()
+            if _spool["active_bytes"]:
+                _spool["active"] += 1
+                _spool["active_bytes"] = 0
+            # Whatever is on disk is drained, including segments left by a previous instance or a crash.
+            active = spool_segment_path(_spool["active"]) if _spool["active"] is not None else None
+            segments = [path for _, path in await run_in_thread(list_spool_segments) if path != active]
+
+        for path in segments:
+            records = await run_in_thread(read_spool_segment, path)
+            remaining = []
+            blocked = set()
+            settled = 0
+            for record in records:
+                dest_id = record.get("dest")
+                if dest_id in blocked or _spool["next_attempt"].get(dest_id, 0) > time.monotonic() or not breaker_allows(dest_id):
+                    blocked.add(dest_id)
+                    remaining.append(record)
+                    continue
+                source = current_source_for(dest_id)
+                if not source:
+                    print(f"Channel Logger | Dropping spooled entry for removed destination {dest_id}.", type_="INFO")
+                    settled += 1
+                    continue
+                webhook_url = source["webhook_url"]
+                msg = record.get("message", {})
+                replay = (msg.get("content"), None, msg.get("embeds") or None, msg.get("username"), msg.get("avatar_url"), msg.get("files") or None)
+                outcome = await send_webhook_message(webhook_url, *replay)
+                # A deleted webhook is replaced here too; otherwise a quiet source's spool would never drain.
+                if outcome["kind"] == "gone" and not _delivery["closing"]:
+                    print("Channel Logger | Webhook is gone, attempting to recreate...", type_="ERROR")
+                    new_url = await recreate_webhook(source, webhook_url)
+                    if new_url:
+                        outcome = await send_webhook_message(new_url, *replay)
+                    else:
+                        print("Channel Logger | Could not recreate webhook.", type_="ERROR")
+                # Recreation has its own cooldown, so a webhook that stays gone must not open the circuit for live sends.
+                if outcome["kind"] != "gone":
+                    record_delivery(dest_id, outcome)
+                if outcome["ok"]:
+                    settled += 1
+                    _spool["drained"] += 1
+                    _spool["backoff"].pop(dest_id, None)
+                    _spool["next_attempt"].pop(dest_id, None)
+                else:
+                    backoff = min(_spool["backoff"].get(dest_id, SPOOL_BACKOFF_BASE / 2) * 2, SPOOL_BACKOFF_MAX)
+                    _spool["backoff"][dest_id] = backoff
+                    _spool["next_attempt"][dest_id] = time.monotonic() + backoff
+                    blocked.add(dest_id)
+                    remaining.append(record)
+            if settled:
+                _spool["pending"] = max(_spool["pending"] - settled, 0)
+                await run_in_thread(rewrite_spool_segment, path, remaining)
+                update_spool_text()
+
+    async def spool_drainer(previous_shutdown=None):
+        if previous_shutdown is not None:
+            # The old instance spools its in-flight payloads on the way out; count them only once they are on disk.
+            await asyncio.wait([previous_shutdown], timeout=SPOOL_HANDOFF_WAIT)
+        async with _spool["lock"]:
+            await run_in_thread(SPOOL_DIR.mkdir, parents=True, exist_ok=True)
+            segments = await run_in_thread(list_spool_segments)
+            _spool["pending"] = len(_spool["buffer"]) + sum([len(await run_in_thread(read_spool_segment, path)) for _, path in segments])
+        update_spool_text()
+        while True:
+            await asyncio.sleep(SPOOL_DRAIN_INTERVAL)
+            try:
+                await drain_spool()
+            except Exception as e:
+                print(f"Channel Logger | Spool drain error: {e}", type_="ERROR")
+
+    VAULT_DIR = BASE_DIR / "ChannelLoggerVault"
+    VAULT_CONCURRENCY = 3
+    VAULT_PENDING_WAIT = 10.0
+    VAULT_URL_LIMIT = 20000
+    VAULT_INDEX_FILE = BASE_DIR / "ChannelLoggerVault.json"
+    VAULT_INDEX_DELAY = 5.0
+    _vault = {"files": OrderedDict(), "bytes": 0, "by_url": OrderedDict(), "pending": {}, "semaphore": None, "loader": None, "index_handle": None}
+
+    def scan_vault():
+        VAULT_DIR.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in VAULT_DIR.iterdir():
+            if path.suffix == ".tmp":
+                path.unlink(missing_ok=True)
+                continue
+            stat = path.stat()
+            entries.append((stat.st_mtime, path.name, stat.st_size))
+        return sorted(entries)
+
+    async def load_vault():
+        # Every caller waits on the same scan, so nothing reads the URL index before it is loaded.
+        if _vault["loader"] is None:
+            _vault["loader"] = asyncio.get_event_loop().create_task(read_vault())
+        await asyncio.shield(_vault["loader"])
+
+    async def read_vault():
+        try:
+            entries = await run_in_thread(scan_vault)
+            index = await run_in_thread(read_vault_index)
+        except OSError as e:
+            print(f"Channel Logger | Vault scan failed: {e}", type_="ERROR")
+            return
+        on_disk = {name for _, name, _ in entries}
+        for url, name in index.items():
+            if name in on_disk and url not in _vault["by_url"]:
+                _vault["by_url"][url] = name
+        referenced = set(_vault["by_url"].values())
+        orphaned = []
+        for _, name, size in entries:
+            # A file no URL maps to can never be served again, so it shouldn't hold budget.
+            if name not in referenced:
+                orphaned.append(name)
+                continue
+            _vault["files"][name] = size
+            _vault["bytes"] += size
+        if orphaned:
+            await run_in_thread(delete_vault_files, orphaned)
+
+    def read_vault_index():
+        try:
+            with open(VAULT_INDEX_FILE, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write_vault_index(data):
+        tmp = VAULT_INDEX_FILE.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, VAULT_INDEX_FILE)
+
+    def schedule_vault_index_save():
+        if _vault["index_handle"] is None:
+            loop = asyncio.get_event_loop()
+            _vault["index_handle"] = loop.call_later(VAULT_INDEX_DELAY, lambda: loop.create_task(save_vault_index()))
+
+    async def save_vault_index():
+        if _vault["index_handle"] is not None:
+            _vault["index_handle"].cancel()
+            _vault["index_handle"] = None
+        if _vault["loader"] is None or not _vault["loader"].done():
+            return
+        try:
+            await run_in_thread(write_vault_index, json.dumps(_vault["by_url"]))
+        except OSError as e:
+            print(f"Channel Logger | Vault index write failed: {e}", type_="ERROR")
+
+    def write_vault_file(chunks, extension):
+        digest = hashlib.sha256()
+        for chunk in chunks:
+            digest.update(chunk)
+        name = digest.hexdigest() + extension
+        path = VAULT_DIR / name
+        if not path.exists():
+            VAULT_DIR.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+            os.replace(tmp, path)
+        return name
+
+    def delete_vault_files(names):
+        for name in names:
+            try:
+                (VAULT_DIR / name).unlink()
+            except OSError:
+                pass
+
+    def touch_vault_file(path):
+        name = os.path.basename(path)
+        if name in _vault["files"]:
+            _vault["files"].move_to_end(name)
+
+    async def enforce_vault_budget(budget_bytes):
+        evicted = []
+        while _vault["bytes"] > budget_bytes and len(_vault["files"]) > 1:
+            name, size = _vault["files"].popitem(last=False)
+            _vault["bytes"] -= size
+            evicted.append(name)
+        if evicted:
+            gone = set(evicted)
+            for url in [u for u, n in _vault["by_url"].items() if n in gone]:
+                del _vault["by_url"][url]
+            await run_in_thread(delete_vault_files, evicted)
+            schedule_vault_index_save()
+
+    async def fetch_into_vault(url, filename, config):
+        if _vault["semaphore"] is None:
+            _vault["semaphore"] = asyncio.Semaphore(VAULT_CONCURRENCY)
+        max_bytes = max(int(config.get("vault_max_file_mb", 25)), 1) * 1024 * 1024
+        async with _vault["semaphore"]:
+            await load_vault()
+            try:
+                session = await get_cdn_session()
+                chunks, received = [], 0
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                        received += len(chunk)
+                        if received > max_bytes:
+                            return None
+                        chunks.append(chunk)
+                # Hashing and the disk write happen in the executor; identical files collapse onto one sha256 name.
+                name = await run_in_thread(write_vault_file, chunks, os.path.splitext(filename)[1].lower()[:16])
+            except Exception as e:
+                _metrics["downloads_failed"] += 1
+                print(f"Channel Logger | Vault download failed: {e}", type_="ERROR")
+                return None
+        if name not in _vault["files"]:
+            _vault["files"][name] = received
+            _vault["bytes"] += received
+        _vault["files"].move_to_end(name)
+        _vault["by_url"][url] = name
+        orphaned = []
+        while len(_vault["by_url"]) > VAULT_URL_LIMIT:
+            _, dropped = _vault["by_url"].popitem(last=False)
+            if dropped != name and dropped not in _vault["by_url"].values():
+                orphaned.append(dropped)
+        for dropped in orphaned:
+            _vault["bytes"] -= _vault["files"].pop(dropped, 0)
+        if orphaned:
+            await run_in_thread(delete_vault_files, orphaned)
+        schedule_vault_index_save()
+        await enforce_vault_budget(max(int(config.get("vault_budget_mb", 256)), 1) * 1024 * 1024)
+        return name
+
+    def prefetch_attachments(snapshot, config):
+        max_bytes = max(int(config.get("vault_max_file_mb", 25)), 1) * 1024 * 1024
+        loop = asyncio.get_event_loop()
+        for filename, url, size in snapshot.attachments:
+            if (size or 0) > max_bytes or url in _vault["by_url"] or url in _vault["pending"]:
+                continue
+            task = loop.create_task(fetch_into_vault(url, filename, config))
+            _vault["pending"][url] = task
+            task.add_done_callback(lambda _, u=url: _vault["pending"].pop(u, None))
+
+    async def vaulted_files(attachments):
+        await load_vault()
+        pending = [_vault["pending"][url] for _, url, _ in attachments if url in _vault["pending"]]
+        if pending:
+            await asyncio.wait(pending, timeout=VAULT_PENDING_WAIT)
+        files = []
+        for filename, url, size in attachments:
+            name = _vault["by_url"].get(url)
+            if name and name in _vault["files"]:
+                files.append({"filename": filename, "path": str(VAULT_DIR / name), "url": url, "size": _vault["files"][name]})
+            else:
+                files.append(attachment_file(filename, url, size))
+        return files
+
+    def vault_stats():
+        return {"files": len(_vault["files"]), "bytes": _vault["bytes"]}
+
+    EVENTS_DIR = BASE_DIR / "ChannelLoggerEvents"
+    EVENTS_DB = BASE_DIR / "ChannelLoggerEvents.db"
+    SINK_SEGMENT_BYTES = 8 * 1024 * 1024
+    SINK_BATCH_SIZE = 500
+    SINK_BATCH_DELAY = 1.0
+    SINK_QUEUE_LIMIT = 100000
+    SINK_RETENTION_INTERVAL = 600.0
+    _sink = {"queue": None, "writer": None, "segment": None, "segment_bytes": 0, "db": None, "dropped": 0, "written": 0, "retention_at": 0.0}
+
+    def local_event(kind, guild, channel, snapshot=None, **extra):
+        event = {
+            "ts": time.time(), "event": kind,
+            "guild_id": str(guild.id) if guild else None, "channel_id": str(channel.id) if channel else None
+        }
+        if snapshot is not None:
+            event.update({
+                "message_id": str(snapshot.id), "author_id": str(snapshot.author_id), "author": snapshot.author_name,
+                "created_at": snapshot.created_at, "content": snapshot.content,
+                "attachments": [{"filename": f, "url": u, "size": s} for f, u, s in snapshot.attachments]
+            })
+        event.update(extra)
+        return event
+
+    def route_to_local_sink(matched, event):
+        mode = matched.get("sink", "webhook")
+        if mode == "webhook":
+            return False
+        queue = _sink["queue"]
+        if queue is None:
+            queue = _sink["queue"] = asyncio.Queue()
+        if queue.qsize() >= SINK_QUEUE_LIMIT:
+            _sink["dropped"] += 1
+        else:
+            event["source"] = f"{matched.get('type')}:{matched.get('id')}"
+            queue.put_nowait(event)
+            if _sink["writer"] is None or _sink["writer"].done():
+                _sink["writer"] = asyncio.get_event_loop().create_task(sink_writer())
+        return mode == "local"
+
+    def compress_segment(path):
+        with open(path, "rb") as src, gzip.open(str(path) + ".gz", "wb", compresslevel=6) as dst:
+            while True:
+                chunk = src.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                dst.write(chunk)
+        os.remove(path)
+
+    def write_jsonl_batch(events):
+        EVENTS_DIR.mkdir(parents=True, exist_ok=True)
+        if _sink["segment"] is None or _sink["segment_bytes"] >= SINK_SEGMENT_BYTES:
+            if _sink["segment"] is not None and os.path.exists(_sink["segment"]):
+                compress_segment(_sink["segment"])
+            elif _sink["segment"] is None:
+                # Segments left open by a previous run are sealed before a new one starts.
+                for leftover in EVENTS_DIR.glob("events-*.jsonl"):
+                    compress_segment(leftover)
+            _sink["segment"] = str(EVENTS_DIR / f"events-{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}.jsonl")
+            _sink["segment_bytes"] = 0
+        data = "".join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in events).encode("utf-8")
+        with open(_sink["segment"], "ab") as f:
+            f.write(data)
+        _sink["segment_bytes"] += len(data)
+
+    def open_events_db():
+        db = _sink["db"]
+        if db is None:
+            db = sqlite3.connect(str(EVENTS_DB), check_same_thread=False)
+            # auto_vacuum only takes effect before the header is written, which switching to WAL already does.
+            db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS events (id INTEGER PRIMARY KEY, ts REAL, event TEXT, source TEXT, "
+                "guild_id TEXT, channel_id TEXT, message_id TEXT, author_id TEXT, data TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS events_ts ON events (ts)")
+            db.execute("CREATE INDEX IF NOT EXISTS events_message ON events (message_id)")
+            _sink["db"] = db
+        return db
+
+    def write_sqlite_batch(events):
+        db = open_events_db()
+        with db:
+            db.executemany(
+                "INSERT INTO events (ts, event, source, guild_id, channel_id, message_id, author_id, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(e["ts"], e["event"], e.get("source"), e.get("guild_id"), e.get("channel_id"), e.get("message_id"), e.get("author_id"), json.dumps(e, ensure_ascii=False, default=str)) for e in events]
+            )
+
+    def apply_retention(sink_format, max_age_days, max_bytes):
+        cutoff = time.time() - max_age_days * 86400
+        if sink_format == "sqlite":
+            if not EVENTS_DB.exists():
+                return
+            db = open_events_db()
+            with db:
+                db.execute("DELETE FROM events WHERE ts < ?", (cutoff,))
+            # The file itself only shrinks after a checkpoint, so size is measured in live pages instead.
+            page_size = db.execute("PRAGMA page_size").fetchone()[0]
+            used = (db.execute("PRAGMA page_count").fetchone()[0] - db.execute("PRAGMA freelist_count").fetchone()[0]) * page_size
+            if used > max_bytes:
+                rows = db.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+                drop = -(-rows * (used - max_bytes) // used)
+                if drop:
+                    with db:
+                        db.execute("DELETE FROM events WHERE id IN (SELECT id FROM events ORDER BY id LIMIT ?)", (drop,))
+            # execute() would step the pragma once and free a single page; executescript runs it to completion.
+            db.executescript("PRAGMA incremental_vacuum;")
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return
+        if not EVENTS_DIR.exists():
+            return
+        segments = sorted((p.stat().st_mtime, p) for p in EVENTS_DIR.iterdir() if p.name.startswith("events-"))
+        total = sum(p.stat().st_size for _, p in segments)
+        for mtime, path in segments:
+            if str(path) == _sink["segment"]:
+                continue
+            if mtime >= cutoff and total <= max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink()
+
+    async def sink_writer():
+        queue = _sink["queue"]
+        stopping = False
+        while not stopping:
+            try:
+                events = [await asyncio.wait_for(queue.get(), WORKER_IDLE_TIMEOUT)]
+            except asyncio.TimeoutError:
+                break
+            # Gather whatever arrives within the batch window so disk writes stay few and large.
+            deadline = time.monotonic() + SINK_BATCH_DELAY
+            while len(events) < SINK_BATCH_SIZE and events[-1] is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    events.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            if events[-1] is None:
+                stopping = True
+                events.pop()
+            if not events:
+                continue
+            config = get_routing()["config"]
+            sink_format = config.get("local_sink_format", "jsonl")
+            try:
+                await run_in_thread(write_sqlite_batch if sink_format == "sqlite" else write_jsonl_batch, events)
+                _sink["written"] += len(events)
+                if time.monotonic() - _sink["retention_at"] >= SINK_RETENTION_INTERVAL:
+                    _sink["retention_at"] = time.monotonic()
+                    await run_in_thread(apply_retention, sink_format, max(int(config.get("local_retention_days", 30)), 1), max(int(config.get("local_retention_mb", 512)), 1) * 1024 * 1024)
+            except Exception as e:
+                print(f"Channel Logger | Local sink write failed ({len(events)} events): {e}", type_="ERROR")
+
+    async def close_local_sink():
+        writer = _sink["writer"]
+        if writer and not writer.done():
+            _sink["queue"].put_nowait(None)
+            await writer
+        if _sink["db"] is not None:
+            _sink["db"].close()
+            _sink["db"] = None
+
+    async def stop_delivery_workers():
+        for key in list(_batches):
+            flush_batch(key)
+        _delivery["closing"] = True
+        for worker in list(_delivery["workers"].values()):
+            worker.cancel()
+        for queue in _delivery["queues"].values():
+            while not queue.empty():
+                future = queue.get_nowait()[-1]
+                if not future.done():
+                    future.set_result(delivery_outcome(None))
+        _delivery["workers"].clear()
+
+    URL_PATTERN = re.compile(r'(https?://[^\s<>"{}|\\^`\[\]]+)')
 
     def extract_all_urls(text):
         if not text:
             return []
         seen = set()
         out = []
-        for m in re.findall(r'(https?://[^\s<>"{}|\\^`\[\]]+)', text):
+        for m in URL_PATTERN.findall(text):
             m = m.rstrip('.,;:!)?]\'"')
             if m not in seen:
                 seen.add(m)
@@ -267,21 +1477,201 @@ def ChannelLogger():
             return f"{parent_name} > {channel.name}"
         return channel.name if hasattr(channel, "name") else "unknown"
 
-    def find_matched_source(config, channel_id, server_id, category_id=None, parent_channel_id=None):
-        for source in config.get("sources", []):
-            if source["type"] == "thread" and source["id"] == channel_id:
-                return source
-            if source["type"] == "channel" and source["id"] == channel_id:
-                return source
-            if source["type"] == "channel" and parent_channel_id and source["id"] == parent_channel_id:
-                return source
-            if source["type"] == "category" and category_id and source["id"] == category_id and source.get("server_id") == server_id:
-                return source
-            if source["type"] == "server" and source["id"] == server_id:
-                return source
-        return None
+    _templates = {}
+    TEMPLATE_LIMIT = 4096
+
+    def channel_template(channel, guild):
+        # Everything in a log embed that depends only on the channel, guild and theme, built once per channel.
+        load_theme()
+        template = _templates.get(channel.id)
+        if template is not None and template["theme"] == _theme_cache["version"]:
+            return template
+        theme_color, theme_small_image, theme_large_image = _theme_cache["values"]
+        channel_name = get_channel_display_name(channel)
+        channel_field = {"name": "Channel", "value": f"<#{channel.id}>", "inline": True}
+        extras = {}
+        if theme_small_image:
+            extras["thumbnail"] = {"url": theme_small_image}
+        if theme_large_image:
+            extras["image"] = {"url": theme_large_image}
+        template = {
+            "theme": _theme_cache["version"],
+            "color": theme_color,
+            "extras": extras,
+            "channel_name": channel_name,
+            "server_name": guild.name if guild else "Direct Message",
+            "avatar_url": guild.icon.url if guild and guild.icon else None,
+            "link_prefix": f"https://discord.com/channels/{guild.id if guild else '@me'}/{channel.id}/",
+            "channel_field": channel_field,
+            "titles": {
+                "message": f"#{channel_name}",
+                "delete": f"Message Deleted in #{channel_name}",
+                "edit": f"Message Edited in #{channel_name}",
+                "bulk": f"Bulk Delete in #{channel_name}",
+                "reactions": f"Reactions in #{channel_name}"
+            }
+        }
+        if len(_templates) >= TEMPLATE_LIMIT:
+            _templates.clear()
+        _templates[channel.id] = template
+        return template
+
+    @bot.listen('on_guild_channel_update')
+    async def invalidate_channel_templates(before, after):
+        # Thread titles include the parent's name, so a rename has to drop more than the one channel.
+        _templates.clear()
+
+    @bot.listen('on_guild_channel_delete')
+    async def drop_channel_template(channel):
+        _templates.pop(channel.id, None)
+
+    @bot.listen('on_thread_update')
+    async def invalidate_thread_template(before, after):
+        _templates.pop(after.id, None)
+
+    @bot.listen('on_guild_update')
+    async def invalidate_guild_templates(before, after):
+        if before.name != after.name or before.icon != after.icon:
+            _templates.clear()
+
+    _routing = {"mtime": None, "config": None, "dest_ids": set(), "by_id": {}, "by_channel": {}, "by_category": {}, "by_server": {}, "filters": {}, "memo": {}}
+    ROUTE_MEMO_LIMIT = 4096
+
+    _filter_stats = {}
+    _filter_ui = {"refreshed": 0.0}
+    FILTER_UI_INTERVAL = 2.0
+
+    def compile_source_filter(rules):
+        if not rules:
+            return None
+        checks = []
+        if rules.get("skip_bots"):
+            checks.append(lambda m: not getattr(m.author, "bot", False))
+        include_authors = frozenset(str(a) for a in rules.get("include_authors", []))
+        exclude_authors = frozenset(str(a) for a in rules.get("exclude_authors", []))
+        if include_authors:
+            checks.append(lambda m: str(m.author.id) in include_authors)
+        if exclude_authors:
+            checks.append(lambda m: str(m.author.id) not in exclude_authors)
+        include_roles = frozenset(str(r) for r in rules.get("include_roles", []))
+        exclude_roles = frozenset(str(r) for r in rules.get("exclude_roles", []))
+        if include_roles or exclude_roles:
+            def role_check(m):
+                roles = {str(r.id) for r in getattr(m.author, "roles", [])}
+                return (not include_roles or not roles.isdisjoint(include_roles)) and roles.isdisjoint(exclude_roles)
+            checks.append(role_check)
+        include_keywords = tuple(k.lower() for k in rules.get("include_keywords", []) if k)
+        exclude_keywords = tuple(k.lower() for k in rules.get("exclude_keywords", []) if k)
+        if include_keywords:
+            checks.append(lambda m: any(k in (m.content or "").lower() for k in include_keywords))
+        if exclude_keywords:
+            checks.append(lambda m: not any(k in (m.content or "").lower() for k in exclude_keywords))
+        for key, wanted in (("include_regex", True), ("exclude_regex", False)):
+            if not rules.get(key):
+                continue
+            try:
+                pattern = re.compile(rules[key], re.IGNORECASE)
+            except re.error as e:
+                print(f"Channel Logger | Ignoring invalid {key.replace('_', ' ')}: {e}", type_="ERROR")
+                continue
+            checks.append(lambda m, p=pattern, w=wanted: bool(p.search(m.content or "")) == w)
+        sample = min(max(float(rules.get("sample", 1.0)), 0.0), 1.0)
+        if sample < 1.0:
+            # Multiplicative hashing of the snowflake keeps the same message in or out on every evaluation.
+            threshold = int(sample * 2 ** 32)
+            checks.append(lambda m: (m.id * 2654435761) % 2 ** 32 < threshold)
+        if not checks:
+            return None
+        checks = tuple(checks)
+        return lambda m: all(check(m) for check in checks)
+
+    def source_passes_filter(routing, matched, message):
+        predicate = routing["filters"].get(id(matched))
+        if predicate is None or predicate(message):
+            return True
+        key = (matched.get("type"), matched.get("id"))
+        _filter_stats[key] = _filter_stats.get(key, 0) + 1
+        now = time.monotonic()
+        if now - _filter_ui["refreshed"] >= FILTER_UI_INTERVAL:
+            _filter_ui["refreshed"] = now
+            update_source_health()
+        return False
+
+    def build_routing(config):
+        by_id, by_channel, by_category, by_server = {}, {}, {}, {}
+        filters = {}
+        for index, source in enumerate(config.get("sources", [])):
+            predicate = compile_source_filter(source.get("filters"))
+            if predicate is not None:
+                filters[id(source)] = predicate
+            stype, sid = source.get("type"), source.get("id")
+            if stype in ("thread", "channel"):
+                by_id.setdefault(sid, index)
+            if stype == "channel":
+                by_channel.setdefault(sid, index)
+            elif stype == "category":
+                by_category.setdefault((sid, source.get("server_id")), index)
+            elif stype == "server":
+                by_server.setdefault(sid, index)
+        _routing.update({
+            "config": config, "dest_ids": get_all_dest_channel_ids(config),
+            "by_id": by_id, "by_channel": by_channel, "by_category": by_category, "by_server": by_server, "filters": filters, "memo": {}
+        })
+
+    def get_routing():
+        try:
+            mtime = CONFIG_FILE.stat().st_mtime_ns
+        except OSError:
+            mtime = -1
+        if _routing["config"] is None or mtime != _routing["mtime"]:
+            build_routing(load_config())
+            _routing["mtime"] = mtime
+        return _routing
+
+    def invalidate_routing():
+        _routing["config"] = None
+
+    def find_matched_source(routing, channel_id, server_id, category_id=None, parent_channel_id=None):
+        # Sources earlier in the list win, matching the order the old linear scan checked them in.
+        candidates = [routing["by_id"].get(channel_id), routing["by_server"].get(server_id)]
+        if parent_channel_id:
+            candidates.append(routing["by_channel"].get(parent_channel_id))
+        if category_id:
+            candidates.append(routing["by_category"].get((category_id, server_id)))
+        candidates = [c for c in candidates if c is not None]
+        if not candidates:
+            return None
+        return routing["config"]["sources"][min(candidates)]
+
+    def resolve_source(channel, guild, routing):
+        memo = routing["memo"]
+        channel_id = str(channel.id)
+        if channel_id in memo:
+            return memo[channel_id]
+        if channel_id in routing["dest_ids"]:
+            matched = None
+        else:
+            _, parent_channel_id, category_id = get_channel_context(channel)
+            server_id = str(guild.id) if guild else None
+            matched = find_matched_source(routing, channel_id, server_id, category_id, parent_channel_id)
+        if len(memo) >= ROUTE_MEMO_LIMIT:
+            memo.clear()
+        memo[channel_id] = matched
+        return matched
+
+    _ui_model = {"servers": None, "guilds": {}, "labels": {}, "rendered": None}
 
     def source_label(source):
+        key = (source.get("type"), source.get("id"), source.get("server_id"), source.get("destination_channel_id"))
+        label = _ui_model["labels"].get(key)
+        if label is None:
+            label, resolved = resolve_source_label(source)
+            if resolved:
+                _ui_model["labels"][key] = label
+        return label
+
+    def resolve_source_label(source):
+        resolved = True
         stype = source.get("type")
         sid = source.get("id")
         server_id = source.get("server_id")
@@ -290,6 +1680,7 @@ def ChannelLogger():
             dest_str = f"#{bot.get_channel(int(dest_id)).name}"
         except:
             dest_str = "unknown dest"
+            resolved = False
         try:
             if stype == "server":
                 src_str = f"Server: {bot.get_guild(int(sid)).name}"
@@ -308,7 +1699,452 @@ def ChannelLogger():
                     src_str = f"{ch.guild.name} > #{ch.name}"
         except:
             src_str = f"{stype} {sid}"
-        return f"{src_str}  ->  {dest_str}"
+            resolved = False
+        return f"{src_str}  ->  {dest_str}", resolved
+
+    CachedMessage = namedtuple("CachedMessage", "id author_id author_name author_avatar content attachments embeds created_at")
+    _recent = {"channels": OrderedDict(), "bytes": 0, "count": 0}
+    RECENT_PER_CHANNEL = 500
+    CACHED_MESSAGE_OVERHEAD = 400
+
+    def author_display_name(author):
+        if not author:
+            return "Unknown"
+        if getattr(author, "discriminator", None) and author.discriminator != "0":
+            return f"{author.name}#{author.discriminator}"
+        return author.name
+
+    def forwardable_embeds(message):
+        attachment_urls = set(att.url for att in message.attachments) if message.attachments else set()
+        out = []
+        for original_embed in message.embeds or []:
+            ed = original_embed.to_dict()
+            embed_type = ed.get("type", "")
+            if embed_type in ("link", "image", "video", "gifv"):
+                continue
+            embed_url = ed.get("url", "")
+            image_url = (ed.get("image") or {}).get("url", "")
+            video_url = (ed.get("video") or {}).get("url", "")
+            thumb_url = (ed.get("thumbnail") or {}).get("url", "")
+            if any(u in attachment_urls for u in [embed_url, image_url, video_url, thumb_url]):
+                continue
+            out.append(ed)
+        return out
+
+    def snapshot_message(message):
+        author = message.author
+        return CachedMessage(
+            message.id,
+            author.id if author else None,
+            author_display_name(author),
+            str(author.avatar.url) if author and author.avatar else None,
+            message.content or "",
+            tuple((att.filename, att.url, getattr(att, "size", None)) for att in message.attachments),
+            tuple(forwardable_embeds(message)),
+            calendar.timegm(message.created_at.timetuple())
+        )
+
+    def cached_message_size(entry):
+        size = CACHED_MESSAGE_OVERHEAD + len(entry.content) + len(entry.author_name) + len(entry.author_avatar or "")
+        for filename, url, _ in entry.attachments:
+            size += len(filename) + len(url) + 64
+        for embed in entry.embeds:
+            size += len(json.dumps(embed))
+        return size
+
+    def _drop_recent(bucket, message_id):
+        entry = bucket.pop(message_id, None)
+        if entry is not None:
+            _recent["bytes"] -= cached_message_size(entry)
+            _recent["count"] -= 1
+        return entry
+
+    def cache_recent_message(channel_id, entry, budget_bytes):
+        channels = _recent["channels"]
+        bucket = channels.get(channel_id)
+        if bucket is None:
+            bucket = channels[channel_id] = OrderedDict()
+        else:
+            channels.move_to_end(channel_id)
+            _drop_recent(bucket, entry.id)
+        bucket[entry.id] = entry
+        _recent["bytes"] += cached_message_size(entry)
+        _recent["count"] += 1
+        if len(bucket) > RECENT_PER_CHANNEL:
+            _drop_recent(bucket, next(iter(bucket)))
+        # Evict the oldest messages of the least recently active channels until back under budget.
+        while _recent["bytes"] > budget_bytes and channels:
+            lru_id, lru_bucket = next(iter(channels.items()))
+            _drop_recent(lru_bucket, next(iter(lru_bucket)))
+            if not lru_bucket:
+                del channels[lru_id]
+
+    def get_recent_message(channel_id, message_id):
+        bucket = _recent["channels"].get(channel_id)
+        return bucket.get(message_id) if bucket else None
+
+    def pop_recent_message(channel_id, message_id):
+        bucket = _recent["channels"].get(channel_id)
+        if not bucket:
+            return None
+        entry = _drop_recent(bucket, message_id)
+        if not bucket:
+            del _recent["channels"][channel_id]
+        return entry
+
+    def update_recent_message(channel_id, message_id, content):
+        bucket = _recent["channels"].get(channel_id)
+        entry = bucket.get(message_id) if bucket else None
+        if entry is not None:
+            _recent["bytes"] += len(content) - len(entry.content)
+            bucket[message_id] = entry._replace(content=content)
+
+    def recent_cache_stats():
+        return {"channels": len(_recent["channels"]), "messages": _recent["count"], "bytes": _recent["bytes"]}
+
+    DIGEST_RATE_WINDOW = 5.0
+    _digests = {}
+
+    def digest_state(matched):
+        key = (matched.get("type"), matched.get("id"), matched.get("destination_channel_id"))
+        state = _digests.get(key)
+        if state is None:
+            state = _digests[key] = {"key": key, "events": deque(), "active": False, "digest": None, "timer": None}
+        state["matched"] = matched
+        return state
+
+    def source_rate(state, now, record=False):
+        events = state["events"]
+        if record:
+            events.append(now)
+        while events and events[0] < now - DIGEST_RATE_WINDOW:
+            events.popleft()
+        return len(events) / DIGEST_RATE_WINDOW
+
+    def digest_active(matched):
+        key = (matched.get("type"), matched.get("id"), matched.get("destination_channel_id"))
+        state = _digests.get(key)
+        return bool(state and state["active"])
+
+    def collect_digest(matched, config, message, snapshot):
+        state = digest_state(matched)
+        rate = source_rate(state, time.monotonic(), record=True)
+        threshold = max(float(config.get("digest_threshold", 10)), 1.0)
+        if not state["active"]:
+            if rate < threshold:
+                return False
+            state["active"] = True
+            print(f"Channel Logger | {source_label(matched)} at {rate:.1f} msg/s, switching to digest mode.", type_="INFO")
+            schedule_digest_flush(state, config)
+        digest = state["digest"]
+        if digest is None:
+            digest = state["digest"] = {
+                "count": 0, "authors": Counter(), "author_names": {}, "contents": Counter(), "channels": Counter(),
+                "attachments": 0, "attachment_bytes": 0, "first": None, "last": None,
+                "guild": message.guild
+            }
+        link = f"https://discord.com/channels/{message.guild.id if message.guild else '@me'}/{message.channel.id}/{message.id}"
+        digest["count"] += 1
+        digest["authors"][snapshot.author_id] += 1
+        digest["author_names"][snapshot.author_id] = snapshot.author_name
+        digest["channels"][str(message.channel.id)] += 1
+        normalized = " ".join(snapshot.content.lower().split())[:100] if snapshot.content else ""
+        if normalized:
+            digest["contents"][normalized] += 1
+        digest["attachments"] += len(snapshot.attachments)
+        digest["attachment_bytes"] += sum(att[2] or 0 for att in snapshot.attachments)
+        if digest["first"] is None:
+            digest["first"] = (link, message.created_at)
+        digest["last"] = (link, message.created_at)
+        return True
+
+    def schedule_digest_flush(state, config):
+        interval = min(max(int(config.get("digest_interval", 10)), 2), 300)
+        loop = asyncio.get_event_loop()
+        state["timer"] = loop.call_later(interval, lambda: loop.create_task(flush_digest(state)))
+
+    def build_digest_embed(digest, rate):
+        theme_color = get_theme_values()[0]
+        authors = "\n".join(f"<@{aid}> ({digest['author_names'][aid]}) — {n}" for aid, n in digest["authors"].most_common(10))
+        repeated = "\n".join(f"{n}× {_clip(text, 80)}" for text, n in digest["contents"].most_common(5) if n > 1)
+        channels = "\n".join(f"<#{cid}> — {n}" for cid, n in digest["channels"].most_common(5))
+        first_link, first_at = digest["first"]
+        last_link, last_at = digest["last"]
+        return {
+            "title": f"Digest: {digest['count']} messages",
+            "description": _clip(channels, 4096),
+            "color": theme_color,
+            "fields": [
+                {"name": "Messages", "value": str(digest["count"]), "inline": True},
+                {"name": "Authors", "value": str(len(digest["authors"])), "inline": True},
+                {"name": "Rate", "value": f"{rate:.1f} msg/s", "inline": True},
+                {"name": "Top Authors", "value": _clip(authors, 1024) or "—", "inline": False},
+                {"name": "Top Repeated Content", "value": _clip(repeated, 1024) or "—", "inline": False},
+                {"name": "Attachments", "value": f"{digest['attachments']} ({digest['attachment_bytes'] / 1048576:.1f} MB)", "inline": True},
+                {"name": "First Message", "value": f"[Jump]({first_link}) {discord_ts(first_at)}", "inline": True},
+                {"name": "Last Message", "value": f"[Jump]({last_link}) {discord_ts(last_at)}", "inline": True}
+            ]
+        }
+
+    async def flush_digest(state, final=False):
+        state["timer"] = None
+        digest, state["digest"] = state["digest"], None
+        config = get_routing()["config"]
+        rate = source_rate(state, time.monotonic())
+        if final or rate < max(float(config.get("digest_threshold", 10)), 1.0) / 2:
+            state["active"] = False
+            if not final:
+                print(f"Channel Logger | {source_label(state['matched'])} back to per-message logging.", type_="INFO")
+        else:
+            schedule_digest_flush(state, config)
+        if not digest:
+            return
+        guild = digest["guild"]
+        try:
+            await deliver_to_source(
+                state["matched"], config, embed_data=build_digest_embed(digest, rate),
+                username=guild.name if guild else "Direct Message",
+                avatar_url=guild.icon.url if guild and guild.icon else None
+            )
+        except Exception as e:
+            print(f"Channel Logger | Error sending digest: {e}", type_="ERROR")
+
+    DEDUP_MAX_ENTRIES = 256
+    DEDUP_EDIT_DELAY = 1.0
+    _dedup = {}
+
+    def content_fingerprint(snapshot):
+        text = " ".join(snapshot.content.lower().split())
+        if not text and not snapshot.attachments:
+            return None
+        attachments = sorted((os.path.splitext(filename)[1].lower(), size or 0) for filename, _, size in snapshot.attachments)
+        return hashlib.sha1(json.dumps([text, attachments]).encode()).hexdigest()
+
+    def build_duplicate_embed(entry):
+        authors = list(entry["authors"].items())
+        lines = [f"<@{aid}> ({name})" for aid, name in authors[:20]]
+        if len(authors) > 20:
+            lines.append(f"+ {len(authors) - 20} more")
+        attachments = f"\n*+ {entry['attachments']} attachment(s) per copy*" if entry["attachments"] else ""
+        return {
+            "title": f"Repeated Message in #{entry['channel_name']}",
+            "description": _clip(entry["content"], 3900) + attachments if entry["content"] else attachments.strip() or "*No content*",
+            "color": get_theme_values()[0],
+            "fields": [
+                {"name": "Copies", "value": str(entry["copies"]), "inline": True},
+                {"name": "Authors", "value": str(len(authors)), "inline": True},
+                {"name": "First Copy", "value": f"[Jump to Message]({entry['first_link']})", "inline": True},
+                {"name": "Seen", "value": f"{discord_ts(entry['first_at'])} → {discord_ts(entry['last_at'])}", "inline": False},
+                {"name": "Posted By", "value": _clip("\n".join(lines), 1024), "inline": False}
+            ]
+        }
+
+    def collapse_duplicate(matched, config, message, snapshot):
+        fingerprint = content_fingerprint(snapshot)
+        if fingerprint is None:
+            return False
+        entries = _dedup.setdefault((matched.get("type"), matched.get("id"), matched.get("destination_channel_id")), OrderedDict())
+        now = time.monotonic()
+        window = min(max(int(config.get("dedup_window", 30)), 5), 600)
+        while entries and next(iter(entries.values()))["last_seen"] < now - window:
+            entries.popitem(last=False)
+        entry = entries.get(fingerprint)
+        if entry is None:
+            entries[fingerprint] = {
+                "matched": matched, "guild": message.guild, "channel_name": get_channel_display_name(message.channel),
+                "content": snapshot.content, "attachments": len(snapshot.attachments),
+                "first_link": f"https://discord.com/channels/{message.guild.id if message.guild else '@me'}/{message.channel.id}/{message.id}",
+                "first_at": message.created_at, "last_at": message.created_at, "last_seen": now,
+                "copies": 1, "authors": OrderedDict([(snapshot.author_id, snapshot.author_name)]),
+                "message_id": None, "webhook_url": None, "posting": False, "edit_pending": False, "dirty": False
+            }
+            if len(entries) > DEDUP_MAX_ENTRIES:
+                entries.popitem(last=False)
+            return False
+
+        # The first copy is logged in full; every later copy folds into one summary log that is edited in place.
+        entries.move_to_end(fingerprint)
+        entry["copies"] += 1
+        entry["authors"][snapshot.author_id] = snapshot.author_name
+        entry["last_at"] = message.created_at
+        entry["last_seen"] = now
+        entry["matched"] = matched
+        if entry["message_id"] is None and not entry["posting"]:
+            entry["posting"] = True
+            asyncio.get_event_loop().create_task(post_duplicate_summary(entry))
+        elif entry["message_id"] is not None:
+            schedule_duplicate_edit(entry)
+        else:
+            entry["dirty"] = True
+        return True
+
+    def schedule_duplicate_edit(entry):
+        if entry["edit_pending"]:
+            return
+        entry["edit_pending"] = True
+        loop = asyncio.get_event_loop()
+        loop.call_later(DEDUP_EDIT_DELAY, lambda: loop.create_task(edit_duplicate_summary(entry)))
+
+    async def post_duplicate_summary(entry):
+        matched = entry["matched"]
+        dest_id = matched.get("destination_channel_id")
+        guild = entry["guild"]
+        username = guild.name if guild else "Direct Message"
+        avatar_url = guild.icon.url if guild and guild.icon else None
+        webhook_url = matched.get("webhook_url")
+        embed = build_duplicate_embed(entry)
+        outcome = {"ok": False, "status": None, "kind": "circuit_open"}
+        try:
+            if breaker_allows(dest_id):
+                outcome = await enqueue_webhook_message(webhook_url, embeds=[embed], username=username, avatar_url=avatar_url, options={"wait": True})
+                record_delivery(dest_id, outcome)
+        finally:
+            entry["posting"] = False
+        if outcome["ok"] and outcome.get("message_id"):
+            entry["message_id"] = outcome["message_id"]
+            entry["webhook_url"] = webhook_url
+            if entry["dirty"]:
+                entry["dirty"] = False
+                schedule_duplicate_edit(entry)
+        elif not outcome["ok"]:
+            spool_delivery(dest_id, {"content": None, "embeds": [embed], "username": username, "avatar_url": avatar_url, "files": []})
+
+    async def edit_duplicate_summary(entry):
+        entry["edit_pending"] = False
+        if not entry["message_id"]:
+            return
+        outcome = await enqueue_webhook_message(entry["webhook_url"], embeds=[build_duplicate_embed(entry)], options={"message_id": entry["message_id"]})
+        if outcome["kind"] == "gone":
+            # The summary was deleted (or its webhook was); the next copy posts a fresh one.
+            entry["message_id"] = None
+
+    async def flush_all_digests():
+        for state in list(_digests.values()):
+            if state["timer"]:
+                state["timer"].cancel()
+            if state["active"]:
+                await flush_digest(state, final=True)
+
+    REACTION_MAX_MESSAGES = 2000
+    REACTION_MAX_USERS = 50
+    _reactions = {"pending": OrderedDict(), "timer": None}
+
+    def collect_reaction(payload, added):
+        routing = get_routing()
+        config = routing["config"]
+        if not config["enabled"] or not config.get("log_reactions", False):
+            return
+        if not config.get("log_self", False) and payload.user_id == bot.user.id:
+            return
+        channel = bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        guild = bot.get_guild(payload.guild_id) if payload.guild_id else None
+        matched = resolve_source(channel, guild, routing)
+        if not matched or not matched.get("webhook_url"):
+            return
+        pending = _reactions["pending"]
+        entry = pending.get(payload.message_id)
+        if entry is None:
+            if len(pending) >= REACTION_MAX_MESSAGES:
+                # At the cap the oldest window closes early instead of the store growing.
+                oldest_id, oldest = pending.popitem(last=False)
+                asyncio.get_event_loop().create_task(send_reaction_summary(oldest_id, oldest))
+            window = min(max(int(config.get("reaction_window", 30)), 5), 3600)
+            entry = pending[payload.message_id] = {
+                "matched": matched, "channel_id": payload.channel_id, "guild_id": payload.guild_id,
+                "due": time.monotonic() + window, "first_at": datetime.utcnow(),
+                "emojis": {}, "users": {}, "more_users": 0
+            }
+            schedule_reaction_flush()
+        emoji = str(payload.emoji)
+        counts = entry["emojis"].get(emoji)
+        if counts is None:
+            counts = entry["emojis"][emoji] = [0, 0]
+        counts[0 if added else 1] += 1
+        users = entry["users"]
+        if payload.user_id in users or len(users) < REACTION_MAX_USERS:
+            users[payload.user_id] = added
+        else:
+            entry["more_users"] += 1
+
+    def schedule_reaction_flush():
+        if _reactions["timer"] is not None or not _reactions["pending"]:
+            return
+        due = next(iter(_reactions["pending"].values()))["due"]
+        loop = asyncio.get_event_loop()
+        _reactions["timer"] = loop.call_later(max(due - time.monotonic(), 0), lambda: loop.create_task(flush_reactions()))
+
+    async def flush_reactions(final=False):
+        if _reactions["timer"] is not None:
+            _reactions["timer"].cancel()
+            _reactions["timer"] = None
+        pending = _reactions["pending"]
+        now = time.monotonic()
+        ready = []
+        # Windows open in arrival order, so the ones that are due sit at the front; one timer covers them all.
+        while pending and (final or next(iter(pending.values()))["due"] <= now):
+            ready.append(pending.popitem(last=False))
+        if not final:
+            schedule_reaction_flush()
+        if ready:
+            await asyncio.gather(*(send_reaction_summary(message_id, entry) for message_id, entry in ready))
+
+    def reaction_mentions(user_ids, more=0):
+        text = ", ".join(f"<@{uid}>" for uid in user_ids)
+        if more:
+            text += f" (+{more} more)"
+        return _clip(text, 1024)
+
+    async def send_reaction_summary(message_id, entry):
+        flushed_at = time.monotonic()
+        matched = entry["matched"]
+        config = get_routing()["config"]
+        channel = bot.get_channel(entry["channel_id"])
+        if channel is None:
+            return
+        guild = bot.get_guild(entry["guild_id"]) if entry["guild_id"] else None
+        emojis = entry["emojis"]
+        added_by = [uid for uid, added in entry["users"].items() if added]
+        removed_by = [uid for uid, added in entry["users"].items() if not added]
+        if route_to_local_sink(matched, local_event(
+            "reactions", guild, channel, message_id=str(message_id),
+            emojis={emoji: {"added": a, "removed": r} for emoji, (a, r) in emojis.items()},
+            added_by=[str(uid) for uid in added_by], removed_by=[str(uid) for uid in removed_by]
+        )):
+            return
+
+        template = channel_template(channel, guild)
+        lines = [f"{emoji}  **{a - r:+d}**  (+{a} / -{r})" for emoji, (a, r) in sorted(emojis.items(), key=lambda item: item[1][1] - item[1][0])]
+        fields = [
+            {"name": "Added", "value": str(sum(a for a, _ in emojis.values())), "inline": True},
+            {"name": "Removed", "value": str(sum(r for _, r in emojis.values())), "inline": True},
+            template["channel_field"],
+            {"name": "Message Link", "value": f"[Jump to Message]({template['link_prefix']}{message_id})", "inline": True},
+            {"name": "Since", "value": discord_ts(entry["first_at"]), "inline": True}
+        ]
+        if added_by or entry["more_users"]:
+            fields.append({"name": "Added By", "value": reaction_mentions(added_by, entry["more_users"]) or "—", "inline": False})
+        if removed_by:
+            fields.append({"name": "Removed By", "value": reaction_mentions(removed_by), "inline": False})
+        embed_data = {
+            "title": template["titles"]["reactions"],
+            "description": _clip("\n".join(lines), 4096),
+            "color": template["color"],
+            "fields": fields
+        }
+        snapshot = get_recent_message(str(channel.id), message_id)
+        if snapshot is not None:
+            embed_data["author"] = {"name": snapshot.author_name, "icon_url": snapshot.author_avatar}
+            fields.insert(0, {"name": "Message", "value": _clip(snapshot.content, 1024) or "*No content*", "inline": False})
+
+        try:
+            await deliver_to_source(
+                matched, config, embed_data=embed_data, username=template["server_name"], avatar_url=template["avatar_url"],
+                batch=True, order_key=str(channel.id), event="reactions", received_at=flushed_at
+            )
+        except Exception as e:
+            print(f"Channel Logger | Error logging reactions: {e}", type_="ERROR")
 
     # === UI START ===
 
@@ -339,20 +2175,99 @@ def ChannelLogger():
     log_embeds_toggle = toggle_row_5.create_ui_element(UI.Toggle, label="Log Embeds")
     log_attachments_toggle = toggle_row_5.create_ui_element(UI.Toggle, label="Log Attachments")
 
+    toggle_row_6 = settings_card.create_group(type="columns", gap=4)
+    batch_toggle = toggle_row_6.create_ui_element(UI.Toggle, label="Batch Embeds")
+    digest_toggle = toggle_row_6.create_ui_element(UI.Toggle, label="Digest Under Load")
+
+    toggle_row_7 = settings_card.create_group(type="columns", gap=4)
+    transcript_toggle = toggle_row_7.create_ui_element(UI.Toggle, label="Bulk Delete Transcripts")
+    vault_toggle = toggle_row_7.create_ui_element(UI.Toggle, label="Attachment Vault")
+
+    sink_row = settings_card.create_group(type="columns", gap=4)
+    sink_format_select = sink_row.create_ui_element(UI.Select, label="Local Sink Format", items=[{"id": "jsonl", "title": "JSONL (gzip segments)"}, {"id": "sqlite", "title": "SQLite"}], mode="single", full_width=True)
+    retention_days_input = sink_row.create_ui_element(UI.Input, label="Keep (days)", placeholder="30", value="30")
+    retention_mb_input = sink_row.create_ui_element(UI.Input, label="Keep (MB)", placeholder="512", value="512")
+
+    vault_row = settings_card.create_group(type="columns", gap=4)
+    vault_budget_input = vault_row.create_ui_element(UI.Input, label="Vault Budget (MB)", placeholder="256", value="256")
+    vault_max_input = vault_row.create_ui_element(UI.Input, label="Vault Max File (MB)", placeholder="25", value="25")
+
+    batch_row = settings_card.create_group(type="columns", gap=4)
+    batch_window_input = batch_row.create_ui_element(UI.Input, label="Batch Window (ms)", placeholder="500", value="500")
+    batch_max_input = batch_row.create_ui_element(UI.Input, label="Max Embeds per Batch", placeholder="10", value="10")
+
+    cache_row = settings_card.create_group(type="columns", gap=4)
+    cache_budget_input = cache_row.create_ui_element(UI.Input, label="Message Cache (MB)", placeholder="32", value="32")
+    upload_limit_input = cache_row.create_ui_element(UI.Input, label="Upload Limit (MB)", placeholder="10", value="10")
+
+    dedup_row = settings_card.create_group(type="columns", gap=4)
+    dedup_toggle = dedup_row.create_ui_element(UI.Toggle, label="Collapse Duplicates")
+    dedup_window_input = dedup_row.create_ui_element(UI.Input, label="Duplicate Window (s)", placeholder="30", value="30")
+
+    reaction_row = settings_card.create_group(type="columns", gap=4)
+    reactions_toggle = reaction_row.create_ui_element(UI.Toggle, label="Log Reactions")
+    reaction_window_input = reaction_row.create_ui_element(UI.Input, label="Reaction Window (s)", placeholder="30", value="30")
+
+    digest_row = settings_card.create_group(type="columns", gap=4)
+    digest_threshold_input = digest_row.create_ui_element(UI.Input, label="Digest Threshold (msg/s)", placeholder="10", value="10")
+    digest_interval_input = digest_row.create_ui_element(UI.Input, label="Digest Interval (s)", placeholder="10", value="10")
+
+    shard_row = settings_card.create_group(type="columns", gap=4)
+    shard_count_input = shard_row.create_ui_element(UI.Input, label="Webhooks per Destination", placeholder="1", value="1")
+    shard_strategy_select = shard_row.create_ui_element(UI.Select, label="Webhook Selection", items=[{"id": "least_loaded", "title": "Least loaded"}, {"id": "round_robin", "title": "Round robin"}], mode="single", full_width=True)
+
     save_settings_btn = settings_card.create_ui_element(UI.Button, label="Save", variant="cta", full_width=True)
 
     dest_card = top_row.create_card(gap=2)
     dest_card.create_ui_element(UI.Text, content="Log Destination", size="lg", weight="bold")
     dest_card.create_ui_element(UI.Text, content="Selected destination will be used when adding a source.", size="sm", color="#6b7280")
 
+    def server_item(server):
+        return {
+            "id": str(server.id), "title": server.name,
+            "iconUrl": server.icon.url if server.icon else "https://cdn.discordapp.com/embed/avatars/0.png"
+        }
+
     def build_server_list():
-        servers_list = [{"id": "select_server", "title": "Select server"}]
-        for server in bot.guilds:
-            servers_list.append({
-                "id": str(server.id), "title": server.name,
-                "iconUrl": server.icon.url if server.icon else "https://cdn.discordapp.com/embed/avatars/0.png"
-            })
-        return servers_list
+        if _ui_model["servers"] is None:
+            _ui_model["servers"] = [{"id": "select_server", "title": "Select server"}] + [server_item(server) for server in bot.guilds]
+        return list(_ui_model["servers"])
+
+    def channel_item(ch):
+        label = f"#{ch.name}" if isinstance(ch, discord.TextChannel) else f"[forum] {ch.name}"
+        return {"id": str(ch.id), "title": label}
+
+    def guild_model(guild_id):
+        model = _ui_model["guilds"].get(guild_id)
+        if model is None:
+            server = bot.get_guild(int(guild_id))
+            if server is None:
+                return None
+            model = {
+                "text": [{"id": str(ch.id), "title": f"#{ch.name}"} for ch in server.text_channels],
+                "categories": [{"id": str(cat.id), "title": cat.name} for cat in server.categories],
+                "channels": [channel_item(ch) for ch in server.channels if isinstance(ch, (discord.TextChannel, discord.ForumChannel))],
+                "by_category": {}
+            }
+            _ui_model["guilds"][guild_id] = model
+        return model
+
+    def category_channel_items(guild_id, category_id):
+        model = guild_model(guild_id)
+        if model is None:
+            return None
+        items = model["by_category"].get(category_id)
+        if items is None:
+            category = bot.get_guild(int(guild_id)).get_channel(int(category_id))
+            if not category:
+                return None
+            items = [channel_item(ch) for ch in category.channels if isinstance(ch, (discord.TextChannel, discord.ForumChannel))]
+            model["by_category"][category_id] = items
+        return items
+
+    def invalidate_ui_guild(guild_id):
+        _ui_model["guilds"].pop(str(guild_id), None)
+        _ui_model["labels"].clear()
 
     dest_servers_list = build_server_list()
 
@@ -372,16 +2287,51 @@ def ChannelLogger():
     source_category_select = add_card.create_ui_element(UI.Select, label="Category (optional)", items=[{"id": "none", "title": "No category — full server"}], mode="single", full_width=True)
     source_channel_select = add_card.create_ui_element(UI.Select, label="Channel (optional)", items=[{"id": "none", "title": "No channel — full category/server"}], mode="single", full_width=True)
     source_thread_select = add_card.create_ui_element(UI.Select, label="Thread (optional)", items=[{"id": "none", "title": "No thread — all channel/forum posts"}], mode="single", full_width=True)
+    add_card.create_ui_element(UI.Text, content="Filters (optional, comma separated)", size="sm", weight="bold")
+    filter_author_row = add_card.create_group(type="columns", gap=4)
+    include_authors_input = filter_author_row.create_ui_element(UI.Input, label="Only Author IDs", placeholder="123, 456")
+    exclude_authors_input = filter_author_row.create_ui_element(UI.Input, label="Skip Author IDs", placeholder="123, 456")
+    filter_role_row = add_card.create_group(type="columns", gap=4)
+    include_roles_input = filter_role_row.create_ui_element(UI.Input, label="Only Role IDs", placeholder="123, 456")
+    exclude_roles_input = filter_role_row.create_ui_element(UI.Input, label="Skip Role IDs", placeholder="123, 456")
+    filter_keyword_row = add_card.create_group(type="columns", gap=4)
+    include_keywords_input = filter_keyword_row.create_ui_element(UI.Input, label="Only Keywords", placeholder="invite, nitro")
+    exclude_keywords_input = filter_keyword_row.create_ui_element(UI.Input, label="Skip Keywords", placeholder="gg, lol")
+    filter_regex_row = add_card.create_group(type="columns", gap=4)
+    include_regex_input = filter_regex_row.create_ui_element(UI.Input, label="Only Regex", placeholder="discord\\.gg/\\w+")
+    exclude_regex_input = filter_regex_row.create_ui_element(UI.Input, label="Skip Regex", placeholder="^!\\w+")
+    filter_misc_row = add_card.create_group(type="columns", gap=4)
+    skip_bots_toggle = filter_misc_row.create_ui_element(UI.Toggle, label="Skip Bots")
+    sample_input = filter_misc_row.create_ui_element(UI.Input, label="Sample (%)", placeholder="100", value="100")
+    backfill_row = add_card.create_group(type="columns", gap=4)
+    backfill_toggle = backfill_row.create_ui_element(UI.Toggle, label="Backfill History")
+    backfill_limit_input = backfill_row.create_ui_element(UI.Input, label="Messages per Channel", placeholder="500", value="500")
+    sink_mode_select = add_card.create_ui_element(UI.Select, label="Log To", items=[{"id": "webhook", "title": "Webhook"}, {"id": "both", "title": "Webhook + local sink"}, {"id": "local", "title": "Local sink only"}], mode="single", full_width=True)
     add_source_btn = add_card.create_ui_element(UI.Button, label="Add Source", variant="cta", full_width=True)
 
     manage_card = bottom_row.create_card(gap=2)
     manage_card.create_ui_element(UI.Text, content="Manage Sources", size="lg", weight="bold")
     status_text = manage_card.create_ui_element(UI.Text, content="Logger is enabled", size="sm", color="#4ade80")
     count_text = manage_card.create_ui_element(UI.Text, content="0 sources configured", size="sm", color="#6b7280")
+    cache_text = manage_card.create_ui_element(UI.Text, content="Message cache: empty", size="sm", color="#6b7280")
+    spool_text = manage_card.create_ui_element(UI.Text, content="Spool: empty", size="sm", color="#6b7280")
+    vault_text = manage_card.create_ui_element(UI.Text, content="Vault: disabled", size="sm", color="#6b7280")
+    backfill_text = manage_card.create_ui_element(UI.Text, content="Backfill: idle", size="sm", color="#6b7280")
     channels_display = manage_card.create_group(type="rows", gap=1)
     remove_select = manage_card.create_ui_element(UI.Select, label="Remove Source", items=[{"id": "__none__", "title": "No sources"}], disabled_items=["__none__"], mode="single", full_width=True)
     remove_btn = manage_card.create_ui_element(UI.Button, label="Remove", variant="flat", full_width=True)
 
+    metrics_row = main_container.create_container(type="columns", gap=3)
+    metrics_card = metrics_row.create_card(gap=2)
+    metrics_card.create_ui_element(UI.Text, content="Metrics", size="lg", weight="bold")
+    metrics_card.create_ui_element(UI.Text, content="Latency is measured from event received to webhook acknowledged.", size="sm", color="#6b7280")
+    metrics_summary_text = metrics_card.create_ui_element(UI.Text, content="No events yet", size="sm", color="#6b7280")
+    metrics_events_text = metrics_card.create_ui_element(UI.Text, content="", size="sm")
+    metrics_sources_text = metrics_card.create_ui_element(UI.Text, content="", size="sm", color="#e5e7eb")
+    metrics_btn_row = metrics_card.create_group(type="columns", gap=4)
+    metrics_dump_btn = metrics_btn_row.create_ui_element(UI.Button, label="Dump JSON", variant="flat", full_width=True)
+    metrics_reset_btn = metrics_btn_row.create_ui_element(UI.Button, label="Reset", variant="flat", full_width=True)
+
     # === UI END ===
 
     channel_text_elements = []
@@ -394,11 +2344,7 @@ def ChannelLogger():
             dest_current_text.color = "#f87171"
             return
         try:
-            server = bot.get_guild(int(selected_server_ids[0]))
-            channels_list = [{"id": "select_channel", "title": "Select a channel"}]
-            for channel in server.text_channels:
-                channels_list.append({"id": str(channel.id), "title": f"#{channel.name}"})
-            dest_channel_select.items = channels_list
+            dest_channel_select.items = [{"id": "select_channel", "title": "Select a channel"}] + guild_model(selected_server_ids[0])["text"]
             dest_channel_select.disabled_items = ["select_channel"]
         except Exception as e:
             print(f"Channel Logger | Error updating destination channels: {e}", type_="ERROR")
@@ -423,11 +2369,7 @@ def ChannelLogger():
             source_category_select.items = [{"id": "none", "title": "No category — full server"}]
             return
         try:
-            server = bot.get_guild(int(selected_server_ids[0]))
-            cat_list = [{"id": "none", "title": "No category — full server"}]
-            for cat in server.categories:
-                cat_list.append({"id": str(cat.id), "title": cat.name})
-            source_category_select.items = cat_list
+            source_category_select.items = [{"id": "none", "title": "No category — full server"}] + guild_model(selected_server_ids[0])["categories"]
         except Exception as e:
             print(f"Channel Logger | Error updating categories: {e}", type_="ERROR")
 
@@ -439,28 +2381,16 @@ def ChannelLogger():
                 source_channel_select.items = [{"id": "none", "title": "No channel — full category/server"}]
                 return
             try:
-                server = bot.get_guild(int(server_sel[0]))
-                ch_list = [{"id": "none", "title": "No channel — full server"}]
-                for ch in server.channels:
-                    if isinstance(ch, (discord.TextChannel, discord.ForumChannel)):
-                        label = f"#{ch.name}" if isinstance(ch, discord.TextChannel) else f"[forum] {ch.name}"
-                        ch_list.append({"id": str(ch.id), "title": label})
-                source_channel_select.items = ch_list
+                source_channel_select.items = [{"id": "none", "title": "No channel — full server"}] + guild_model(server_sel[0])["channels"]
             except Exception as e:
                 print(f"Channel Logger | Error loading channels: {e}", type_="ERROR")
             return
         try:
-            server = bot.get_guild(int(server_sel[0]))
-            category = server.get_channel(int(selected_category_ids[0]))
-            if not category:
+            items = category_channel_items(server_sel[0], selected_category_ids[0])
+            if items is None:
                 source_channel_select.items = [{"id": "none", "title": "Category not found"}]
                 return
-            ch_list = [{"id": "none", "title": "No channel — full category"}]
-            for ch in category.channels:
-                if isinstance(ch, (discord.TextChannel, discord.ForumChannel)):
-                    label = f"#{ch.name}" if isinstance(ch, discord.TextChannel) else f"[forum] {ch.name}"
-                    ch_list.append({"id": str(ch.id), "title": label})
-            source_channel_select.items = ch_list
+            source_channel_select.items = [{"id": "none", "title": "No channel — full category"}] + items
         except Exception as e:
             print(f"Channel Logger | Error updating channels for category: {e}", type_="ERROR")
 
@@ -491,12 +2421,30 @@ def ChannelLogger():
         except Exception as e:
             print(f"Channel Logger | Error updating threads: {e}", type_="ERROR")
 
+    def update_backfill_text():
+        summary = backfill_summary()
+        backfill_text.content = summary or "Backfill: idle"
+        backfill_text.color = "#60a5fa" if summary else "#6b7280"
+
+    def update_spool_text():
+        spool_text.content = f"Spool: {_spool['pending']} pending · {_spool['spooled']} spooled · {_spool['drained']} drained"
+        spool_text.color = "#f59e0b" if _spool["pending"] else "#6b7280"
+
     def update_display():
-        config = load_config()
+        config = get_routing()["config"]
         sources = config.get("sources", [])
         status_text.content = f"Status: {'Enabled' if config['enabled'] else 'Disabled'}"
         status_text.color = "#4ade80" if config["enabled"] else "#f87171"
         count_text.content = f"{len(sources)} source{'s' if len(sources) != 1 else ''} configured"
+        stats = recent_cache_stats()
+        cache_text.content = f"Message cache: {stats['messages']} messages in {stats['channels']} channels · {stats['bytes'] / (1024 * 1024):.1f} MB"
+        update_spool_text()
+        if config.get("vault_enabled", False):
+            vault = vault_stats()
+            vault_text.content = f"Vault: {vault['files']} files · {vault['bytes'] / (1024 * 1024):.1f} / {config.get('vault_budget_mb', 256)} MB"
+        else:
+            vault_text.content = "Vault: disabled"
+        update_metrics_text()
         items = [{"id": str(i), "title": source_label(s)} for i, s in enumerate(sources)]
         if items:
             remove_select.items = items
@@ -505,22 +2453,86 @@ def ChannelLogger():
             remove_select.items = [{"id": "__none__", "title": "No sources"}]
             remove_select.disabled_items = ["__none__"]
 
+    def format_latency(micros):
+        if micros is None:
+            return "—"
+        if micros < 10000:
+            return f"{micros / 1000:.1f} ms"
+        return f"{micros / 1000:.0f} ms"
+
+    def update_metrics_text():
+        events = _metrics["events"]
+        total = sum(stats["count"] for stats in events.values())
+        failed = sum(stats["failed"] for stats in events.values())
+        since = datetime.fromtimestamp(_metrics["since"]).strftime("%H:%M")
+        metrics_summary_text.content = (
+            f"Since {since}: {total} events · {failed} failed · {_metrics['bytes_uploaded'] / (1024 * 1024):.1f} MB uploaded · "
+            f"{_metrics['downloads_failed']} downloads failed · queue {queue_depth()} (peak {_metrics['queue_peak']}) · "
+            f"{_metrics['webhook_recreations']} webhook recreations"
+        )
+        metrics_summary_text.color = "#f59e0b" if failed or _metrics["downloads_failed"] else "#6b7280"
+        metrics_events_text.content = "\n".join(
+            f"{event}: {stats['count']} · p50 {format_latency(histogram_percentile(stats['latency'], 0.5))} · p99 {format_latency(histogram_percentile(stats['latency'], 0.99))}"
+            for event, stats in sorted(events.items())
+        )
+        busiest = sorted(_metrics["sources"].values(), key=lambda s: sum(stats["count"] for stats in s["events"].values()), reverse=True)[:6]
+        lines = []
+        for per_source in busiest:
+            latency = merge_histograms(stats["latency"] for stats in per_source["events"].values())
+            count = sum(stats["count"] for stats in per_source["events"].values())
+            lines.append(f"• {source_label(per_source['source'])}: {count} · p50 {format_latency(histogram_percentile(latency, 0.5))} · p99 {format_latency(histogram_percentile(latency, 0.99))}")
+        metrics_sources_text.content = "\n".join(lines)
+
+    async def dump_metrics():
+        snapshot = metrics_snapshot()
+        try:
+            await run_in_thread(METRICS_FILE.write_text, json.dumps(snapshot, indent=2), encoding="utf-8")
+            tab.toast(type="SUCCESS", title="Metrics Saved", description=f"Written to {METRICS_FILE.name}.")
+        except OSError as e:
+            print(f"Channel Logger | Error writing metrics: {e}", type_="ERROR")
+            tab.toast(type="ERROR", title="Save Failed", description="Could not write the metrics file.")
+
+    def clear_metrics():
+        reset_metrics()
+        update_metrics_text()
+
+    source_health_elements = []
+
+    def update_source_health():
+        for el, source, label in source_health_elements:
+            health = breaker_label(source.get("destination_channel_id"))
+            filtered = _filter_stats.get((source.get("type"), source.get("id")), 0)
+            filter_note = f"  [filtered {filtered}]" if source.get("filters") else ""
+            el.content = f"• {label}{filter_note}{health}"
+            el.color = "#f87171" if "open" in health else ("#f59e0b" if health else "#e5e7eb")
+
     def refresh_channels():
+        config = get_routing()["config"]
+        sources = config.get("sources", [])
+        shown = [(source, source_label(source)) for source in sources[:6]]
+        rendered = (tuple(label for _, label in shown), len(sources))
+        if channel_text_elements and rendered == _ui_model["rendered"]:
+            source_health_elements[:] = [(el, source, label) for (el, _, _), (source, label) in zip(source_health_elements, shown)]
+            update_source_health()
+            update_display()
+            return
         for element in channel_text_elements:
             element.visible = False
         channel_text_elements.clear()
-        config = load_config()
-        sources = config.get("sources", [])
+        source_health_elements.clear()
         if sources:
-            for source in sources[:6]:
-                el = channels_display.create_ui_element(UI.Text, content=f"• {source_label(source)}", size="sm")
+            for source, label in shown:
+                el = channels_display.create_ui_element(UI.Text, content=f"• {label}", size="sm")
                 channel_text_elements.append(el)
+                source_health_elements.append((el, source, label))
             if len(sources) > 6:
                 more = channels_display.create_ui_element(UI.Text, content=f"+ {len(sources) - 6} more...", size="sm", color="#6b7280")
                 channel_text_elements.append(more)
         else:
             el = channels_display.create_ui_element(UI.Text, content="No sources yet", size="sm", color="#6b7280")
             channel_text_elements.append(el)
+        _ui_model["rendered"] = rendered
+        update_source_health()
         update_display()
 
     async def save_settings():
@@ -535,7 +2547,72 @@ def ChannelLogger():
         config["log_bulk_deleted"] = log_bulk_toggle.checked
         config["log_embeds"] = log_embeds_toggle.checked
         config["log_attachments"] = log_attachments_toggle.checked
+        config["batch_embeds"] = batch_toggle.checked
+        config["digest_enabled"] = digest_toggle.checked
+        config["dedup_enabled"] = dedup_toggle.checked
+        config["log_reactions"] = reactions_toggle.checked
+        config["bulk_transcripts"] = transcript_toggle.checked
+        config["vault_enabled"] = vault_toggle.checked
+        sink_format = sink_format_select.selected_items
+        config["local_sink_format"] = sink_format[0] if sink_format and sink_format[0] in ("jsonl", "sqlite") else "jsonl"
+        try:
+            config["local_retention_days"] = max(int(retention_days_input.value or "30"), 1)
+        except ValueError:
+            config["local_retention_days"] = 30
+        try:
+            config["local_retention_mb"] = max(int(retention_mb_input.value or "512"), 1)
+        except ValueError:
+            config["local_retention_mb"] = 512
+        try:
+            config["vault_budget_mb"] = max(int(vault_budget_input.value or "256"), 1)
+        except ValueError:
+            config["vault_budget_mb"] = 256
+        try:
+            config["vault_max_file_mb"] = max(int(vault_max_input.value or "25"), 1)
+        except ValueError:
+            config["vault_max_file_mb"] = 25
+        try:
+            config["dedup_window"] = min(max(int(dedup_window_input.value or "30"), 5), 600)
+        except ValueError:
+            config["dedup_window"] = 30
+        try:
+            config["reaction_window"] = min(max(int(reaction_window_input.value or "30"), 5), 3600)
+        except ValueError:
+            config["reaction_window"] = 30
+        try:
+            config["batch_window_ms"] = min(max(int(batch_window_input.value or "500"), 100), 5000)
+        except ValueError:
+            config["batch_window_ms"] = 500
+        try:
+            config["batch_max_embeds"] = min(max(int(batch_max_input.value or "10"), 1), 10)
+        except ValueError:
+            config["batch_max_embeds"] = 10
+        try:
+            config["message_cache_mb"] = max(int(cache_budget_input.value or "32"), 1)
+        except ValueError:
+            config["message_cache_mb"] = 32
+        try:
+            config["upload_limit_mb"] = max(int(upload_limit_input.value or "10"), 1)
+        except ValueError:
+            config["upload_limit_mb"] = 10
+        try:
+            config["digest_threshold"] = max(int(digest_threshold_input.value or "10"), 1)
+        except ValueError:
+            config["digest_threshold"] = 10
+        try:
+            config["digest_interval"] = min(max(int(digest_interval_input.value or "10"), 2), 300)
+        except ValueError:
+            config["digest_interval"] = 10
+        previous_pool_size = config.get("webhooks_per_destination", 1)
+        try:
+            config["webhooks_per_destination"] = min(max(int(shard_count_input.value or "1"), 1), MAX_WEBHOOKS_PER_DESTINATION)
+        except ValueError:
+            config["webhooks_per_destination"] = 1
+        strategy = shard_strategy_select.selected_items
+        config["shard_strategy"] = strategy[0] if strategy and strategy[0] in ("least_loaded", "round_robin") else "least_loaded"
         if save_config(config):
+            if config["webhooks_per_destination"] != previous_pool_size:
+                bot.loop.create_task(validate_all_webhooks())
             update_display()
             tab.toast(type="SUCCESS", title="Settings Saved", description="Your settings have been saved.")
         else:
@@ -578,13 +2655,49 @@ def ChannelLogger():
                 tab.toast(type="ERROR", title="Already Added", description="This server is already being fully logged.")
                 return
 
+        def split_list(value):
+            return [item.strip() for item in (value or "").split(",") if item.strip()]
+
+        filters = {
+            "include_authors": split_list(include_authors_input.value), "exclude_authors": split_list(exclude_authors_input.value),
+            "include_roles": split_list(include_roles_input.value), "exclude_roles": split_list(exclude_roles_input.value),
+            "include_keywords": split_list(include_keywords_input.value), "exclude_keywords": split_list(exclude_keywords_input.value),
+            "include_regex": (include_regex_input.value or "").strip(), "exclude_regex": (exclude_regex_input.value or "").strip(),
+            "skip_bots": skip_bots_toggle.checked
+        }
+        for key in ("include_regex", "exclude_regex"):
+            try:
+                re.compile(filters[key])
+            except re.error as e:
+                tab.toast(type="ERROR", title="Invalid Regex", description=f"{key.replace('_', ' ').title()}: {e}")
+                return
+        try:
+            sample_pct = min(max(float(sample_input.value or "100"), 0.0), 100.0)
+        except ValueError:
+            tab.toast(type="ERROR", title="Invalid Sample", description="Sample must be a percentage between 0 and 100.")
+            return
+        filters = {k: v for k, v in filters.items() if v}
+        backfill_limit = None
+        if backfill_toggle.checked:
+            try:
+                backfill_limit = min(max(int(backfill_limit_input.value or "500"), 1), BACKFILL_MAX_LIMIT)
+            except ValueError:
+                tab.toast(type="ERROR", title="Invalid Backfill", description="Messages per channel must be a number.")
+                return
+        sink_sel = sink_mode_select.selected_items
+        sink_mode = sink_sel[0] if sink_sel and sink_sel[0] in ("webhook", "both", "local") else "webhook"
+        if sample_pct < 100:
+            filters["sample"] = sample_pct / 100
+
         add_source_btn.loading = True
         try:
             existing = next((s for s in config.get("sources", []) if s.get("destination_channel_id") == dest_channel_id and s.get("webhook_url")), None)
-            if existing and await run_in_thread(validate_webhook, existing["webhook_url"]):
+            pool = []
+            if existing and await validate_webhook(existing["webhook_url"]):
                 webhook_url, webhook_id, webhook_token = existing["webhook_url"], existing["webhook_id"], existing["webhook_token"]
+                pool = [dict(w) for w in existing.get("webhook_pool", [])]
             else:
-                webhook_url, webhook_id, webhook_token = await run_in_thread(create_webhook, dest_channel_id, "Channel Logger")
+                webhook_url, webhook_id, webhook_token = await create_webhook(dest_channel_id, "Channel Logger")
                 if not webhook_url:
                     tab.toast(type="ERROR", title="Webhook Failed", description="Could not create webhook in destination channel.")
                     return
@@ -601,10 +2714,17 @@ def ChannelLogger():
             config["sources"].append({
                 "type": stype, "id": sid, "server_id": sv_id,
                 "destination_channel_id": dest_channel_id,
-                "webhook_url": webhook_url, "webhook_id": webhook_id, "webhook_token": webhook_token
+                "webhook_url": webhook_url, "webhook_id": webhook_id, "webhook_token": webhook_token,
+                "webhook_pool": pool,
+                "filters": filters,
+                "sink": sink_mode
             })
 
             if save_config(config):
+                if backfill_limit:
+                    start_backfill(config["sources"][-1], backfill_limit)
+                if not existing and config.get("webhooks_per_destination", 1) > 1:
+                    bot.loop.create_task(validate_all_webhooks())
                 refresh_channels()
                 try:
                     dest_name = f"#{bot.get_channel(int(dest_channel_id)).name}"
@@ -633,11 +2753,22 @@ def ChannelLogger():
             return
         removed = sources.pop(index)
         config["sources"] = sources
+        backfill_key = f"{removed.get('type')}:{removed.get('id')}"
+        if not any(f"{s.get('type')}:{s.get('id')}" == backfill_key for s in sources):
+            backfill_task = _backfill["tasks"].pop(backfill_key, None)
+            if backfill_task:
+                backfill_task.cancel()
+            if _backfill["state"] and _backfill["state"].pop(backfill_key, None) is not None:
+                await persist_backfill()
+                update_backfill_text()
         wh_url = removed.get("webhook_url")
         wh_id = removed.get("webhook_id")
         wh_token = removed.get("webhook_token")
         if wh_id and wh_token and not any(s.get("webhook_url") == wh_url for s in sources):
-            await run_in_thread(lambda: requests.delete(f"https://discord.com/api/v9/webhooks/{wh_id}/{wh_token}", timeout=10, verify=False))
+            await delete_webhook(wh_id, wh_token)
+            for w in removed.get("webhook_pool", []):
+                if w.get("webhook_id") and w.get("webhook_token"):
+                    await delete_webhook(w["webhook_id"], w["webhook_token"])
         if save_config(config):
             refresh_channels()
             tab.toast(type="SUCCESS", title="Source Removed", description="Source has been removed.")
@@ -647,6 +2778,8 @@ def ChannelLogger():
     save_settings_btn.onClick = save_settings
     add_source_btn.onClick = add_source
     remove_btn.onClick = remove_source
+    metrics_dump_btn.onClick = dump_metrics
+    metrics_reset_btn.onClick = clear_metrics
     dest_server_select.onChange = update_dest_channel_list
     dest_channel_select.onChange = update_dest_status
     source_server_select.onChange = update_source_category_list
@@ -654,8 +2787,9 @@ def ChannelLogger():
     source_channel_select.onChange = update_source_thread_list
 
     def hydrate_dropdowns():
-        dest_server_select.items = build_server_list()
-        source_server_select.items = build_server_list()
+        servers = build_server_list()
+        dest_server_select.items = servers
+        source_server_select.items = list(servers)
 
         dest_sel = dest_server_select.selected_items
         if dest_sel and dest_sel[0] not in ["", "select_server"]:
@@ -665,7 +2799,7 @@ def ChannelLogger():
         if src_sel and src_sel[0] not in ["", "select_server"]:
             update_source_category_list(src_sel)
 
-        config = load_config()
+        config = get_routing()["config"]
         last_dest = get_last_dest_channel_id(config)
         if last_dest:
             try:
@@ -681,434 +2815,725 @@ def ChannelLogger():
 
         refresh_channels()
 
+    @bot.listen('on_ready')
+    async def reset_ui_model():
+        _ui_model["servers"] = None
+        _ui_model["guilds"].clear()
+        _ui_model["labels"].clear()
+
+    @bot.listen('on_guild_join')
+    async def ui_guild_join(guild):
+        if _ui_model["servers"] is not None:
+            _ui_model["servers"].append(server_item(guild))
+        invalidate_ui_guild(guild.id)
+
+    @bot.listen('on_guild_remove')
+    async def ui_guild_remove(guild):
+        if _ui_model["servers"] is not None:
+            _ui_model["servers"] = [item for item in _ui_model["servers"] if item["id"] != str(guild.id)]
+        invalidate_ui_guild(guild.id)
+
+    @bot.listen('on_guild_update')
+    async def ui_guild_update(before, after):
+        if _ui_model["servers"] is not None:
+            _ui_model["servers"] = [server_item(after) if item["id"] == str(after.id) else item for item in _ui_model["servers"]]
+        _ui_model["labels"].clear()
+
+    @bot.listen('on_guild_channel_create')
+    async def ui_channel_create(channel):
+        invalidate_ui_guild(channel.guild.id)
+
+    @bot.listen('on_guild_channel_delete')
+    async def ui_channel_delete(channel):
+        invalidate_ui_guild(channel.guild.id)
+
+    @bot.listen('on_guild_channel_update')
+    async def ui_channel_update(before, after):
+        invalidate_ui_guild(after.guild.id)
+
     @bot.listen('on_message')
-    async def log_message(message):
-        config = load_config()
+    async def log_message(message, backfill=False):
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
         if not config["enabled"]:
             return
-        if not config.get("log_on_send", True):
+
+        matched = resolve_source(message.channel, message.guild, routing)
+        if not matched:
             return
-        if not config.get("log_self", False) and message.author.id == bot.user.id:
+        if not source_passes_filter(routing, matched, message):
             return
+        current_channel_id = str(message.channel.id)
 
-        current_channel_id, parent_channel_id, category_id = get_channel_context(message.channel)
-        current_server_id = str(message.guild.id) if message.guild else None
+        snapshot = snapshot_message(message)
+        if not backfill and (config.get("log_deleted", True) or config.get("log_edited", True) or config.get("log_bulk_deleted", True)):
+            cache_recent_message(current_channel_id, snapshot, max(int(config.get("message_cache_mb", 32)), 1) * 1024 * 1024)
+        if not backfill and snapshot.attachments and config.get("vault_enabled", False) and config.get("log_deleted", True):
+            prefetch_attachments(snapshot, config)
 
-        if current_channel_id in get_all_dest_channel_ids(config):
+        if not config.get("log_on_send", True) and not backfill:
             return
-
-        matched = find_matched_source(config, current_channel_id, current_server_id, category_id, parent_channel_id)
-        if not matched:
+        if not config.get("log_self", False) and message.author.id == bot.user.id:
             return
 
         webhook_url = matched.get("webhook_url")
         if not webhook_url:
             return
+        if route_to_local_sink(matched, local_event("message", message.guild, message.channel, snapshot)):
+            return
+        if not backfill and config.get("digest_enabled", False) and collect_digest(matched, config, message, snapshot):
+            return
+        if not backfill and config.get("dedup_enabled", False) and collapse_duplicate(matched, config, message, snapshot):
+            return
 
-        theme_color, theme_small_image, theme_large_image = get_theme_values()
-        server_name = message.guild.name if message.guild else "Direct Message"
-        channel_name = get_channel_display_name(message.channel)
-        message_link = f"https://discord.com/channels/{message.guild.id if message.guild else '@me'}/{message.channel.id}/{message.id}"
-
-        content_text = message.content or ""
-        attachment_urls = set(att.url for att in message.attachments) if message.attachments else set()
-        cleaned_content = content_text or None
-
-        author_display = message.author.name
-        if hasattr(message.author, 'discriminator') and message.author.discriminator and message.author.discriminator != '0':
-            author_display = f"{message.author.name}#{message.author.discriminator}"
+        template = channel_template(message.channel, message.guild)
+        server_name = template["server_name"]
+        channel_name = template["channel_name"]
+        content_text = snapshot.content
 
         embed_data = {
-            "title": f"#{channel_name}",
-            "description": cleaned_content[:2000] if cleaned_content else "*No content*",
-            "color": theme_color,
+            "title": template["titles"]["message"],
+            "description": content_text[:2000] if content_text else "*No content*",
+            "color": template["color"],
             "author": {
-                "name": author_display,
-                "icon_url": str(message.author.avatar.url) if message.author.avatar else None
+                "name": snapshot.author_name,
+                "icon_url": snapshot.author_avatar
             },
             "fields": [
                 {"name": "Author", "value": f"<@{message.author.id}>", "inline": True},
                 {"name": "User ID", "value": str(message.author.id), "inline": True},
-                {"name": "Channel", "value": f"<#{current_channel_id}>", "inline": True},
-                {"name": "Message Link", "value": f"[Jump to Message]({message_link})", "inline": True},
+                template["channel_field"],
+                {"name": "Message Link", "value": f"[Jump to Message]({template['link_prefix']}{message.id})", "inline": True},
                 {"name": "Sent", "value": discord_ts(message.created_at), "inline": False}
-            ]
+            ],
+            **template["extras"]
         }
 
-        if theme_small_image:
-            embed_data["thumbnail"] = {"url": theme_small_image}
-        if theme_large_image:
-            embed_data["image"] = {"url": theme_large_image}
-
         try:
-            avatar_url = message.guild.icon.url if message.guild and message.guild.icon else None
+            avatar_url = template["avatar_url"]
 
             inline_urls = extract_all_urls(content_text)
             ping_content = f"<@{bot.user.id}>" if config.get("ping_on_log", False) else None
             content_to_send = ping_content
 
-            extra_embeds = []
-            if config.get("log_embeds", True) and message.embeds:
-                for original_embed in message.embeds:
-                    ed = original_embed.to_dict()
-                    embed_type = ed.get("type", "")
-                    if embed_type in ("link", "image", "video", "gifv"):
-                        continue
-                    embed_url = ed.get("url", "")
-                    image_url = (ed.get("image") or {}).get("url", "")
-                    video_url = (ed.get("video") or {}).get("url", "")
-                    thumb_url = (ed.get("thumbnail") or {}).get("url", "")
-                    if any(u in attachment_urls for u in [embed_url, image_url, video_url, thumb_url]):
-                        continue
-                    extra_embeds.append(ed)
+            extra_embeds = list(snapshot.embeds) if config.get("log_embeds", True) else []
 
             downloaded_files = []
-            if config.get("log_attachments", True) and message.attachments:
-                results = await asyncio.gather(*[download_attachment(att) for att in message.attachments], return_exceptions=True)
-                for r in results:
-                    if not isinstance(r, Exception) and r and r[0] and r[1]:
-                        downloaded_files.append(r)
-
-            success = await run_in_thread(
-                send_webhook_message,
-                webhook_url=webhook_url,
+            if config.get("log_attachments", True) and snapshot.attachments:
+                if config.get("vault_enabled", False) and not backfill:
+                    # Attachments the vault is already fetching are uploaded from that copy instead of downloaded twice.
+                    downloaded_files = await vaulted_files(snapshot.attachments)
+                else:
+                    downloaded_files = [attachment_file(*att) for att in snapshot.attachments]
+
+            await deliver_to_source(
+                matched,
+                config,
                 content=content_to_send,
                 embed_data=embed_data,
                 embeds=extra_embeds if extra_embeds else None,
                 username=server_name,
                 avatar_url=avatar_url,
-                files=downloaded_files[:10] if downloaded_files else None
+                files=downloaded_files or None,
+                batch=True,
+                order_key=current_channel_id,
+                event="backfill" if backfill else "message",
+                received_at=received_at
             )
 
-            for fp, _ in downloaded_files:
-                try:
-                    os.remove(fp)
-                except Exception:
-                    pass
-
-            if not success:
-                print("Channel Logger | Webhook send failed, attempting to recreate...", type_="ERROR")
-                dest_id = matched.get("destination_channel_id")
-                new_url, new_id, new_token = await run_in_thread(create_webhook, dest_id, "Channel Logger")
-                if new_url:
-                    cfg = load_config()
-                    for s in cfg.get("sources", []):
-                        if s.get("webhook_url") == webhook_url:
-                            s["webhook_url"] = new_url
-                            s["webhook_id"] = new_id
-                            s["webhook_token"] = new_token
-                    save_config(cfg)
-                    webhook_url = new_url
-                    await run_in_thread(
-                        send_webhook_message,
-                        webhook_url=webhook_url,
-                        content=content_to_send,
-                        embed_data=embed_data,
-                        embeds=extra_embeds if extra_embeds else None,
-                        username=server_name,
-                        avatar_url=avatar_url
-                    )
-                else:
-                    print("Channel Logger | Could not recreate webhook.", type_="ERROR")
-                    return
-
-            for i in range(10, len(downloaded_files), 10):
-                await run_in_thread(
-                    send_webhook_message,
-                    webhook_url=webhook_url,
-                    username=server_name,
-                    avatar_url=avatar_url,
-                    files=downloaded_files[i:i+10]
-                )
-
-            if inline_urls:
-                for url in inline_urls:
-                    await run_in_thread(send_webhook_message, webhook_url=webhook_url, content=url, username=server_name, avatar_url=avatar_url)
+            # One URL per line still unfurls, so the links share as few 2000-char messages as possible.
+            for chunk in pack_content(inline_urls):
+                await deliver_to_source(matched, config, content=chunk, username=server_name, avatar_url=avatar_url, order_key=current_channel_id)
 
             if config.get("notify_on_log", True):
-                print(f"Channel Logger | Logged message from {message.author.name} in {channel_name} ({server_name})", type_="INFO")
+                saved = f" · {_batch_stats['requests_saved']} requests saved by batching" if config.get("batch_embeds", False) else ""
+                print(f"Channel Logger | Logged message from {message.author.name} in {channel_name} ({server_name}){saved}", type_="INFO")
         except Exception as e:
             print(f"Channel Logger | Error logging message: {e}", type_="ERROR")
 
     @bot.listen('on_message_delete')
     async def log_deleted(message):
-        config = load_config()
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
         if not config["enabled"] or not config.get("log_deleted", True):
             return
 
-        current_channel_id, parent_channel_id, category_id = get_channel_context(message.channel)
-        current_server_id = str(message.guild.id) if message.guild else None
+        matched = resolve_source(message.channel, message.guild, routing)
+        if not matched:
+            return
+        pop_recent_message(str(message.channel.id), message.id)
+        if not source_passes_filter(routing, matched, message):
+            return
+        await send_deleted_log(config, matched, message.channel, message.guild, snapshot_message(message), received_at)
 
-        if current_channel_id in get_all_dest_channel_ids(config):
+    @bot.listen('on_raw_message_delete')
+    async def log_raw_deleted(payload):
+        if payload.cached_message is not None:
+            return
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
+        if not config["enabled"] or not config.get("log_deleted", True):
             return
 
-        matched = find_matched_source(config, current_channel_id, current_server_id, category_id, parent_channel_id)
+        channel = bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        guild = bot.get_guild(payload.guild_id) if payload.guild_id else None
+        matched = resolve_source(channel, guild, routing)
         if not matched:
             return
+        snapshot = pop_recent_message(str(payload.channel_id), payload.message_id)
+        if snapshot is None:
+            return
+        await send_deleted_log(config, matched, channel, guild, snapshot, received_at)
 
+    async def send_deleted_log(config, matched, channel, guild, snapshot, received_at):
+        urgent = digest_active(matched)
         webhook_url = matched.get("webhook_url")
         if not webhook_url:
             return
+        if route_to_local_sink(matched, local_event("delete", guild, channel, snapshot)):
+            return
 
-        server_name = message.guild.name if message.guild else "Direct Message"
-        channel_name = get_channel_display_name(message.channel)
-        author_display = message.author.name if message.author else "Unknown"
-        if message.author and hasattr(message.author, 'discriminator') and message.author.discriminator and message.author.discriminator != '0':
-            author_display = f"{message.author.name}#{message.author.discriminator}"
+        template = channel_template(channel, guild)
+        server_name = template["server_name"]
 
         fields = [
-            {"name": "Channel", "value": f"<#{current_channel_id}>", "inline": True},
+            template["channel_field"],
             {"name": "Deleted At", "value": discord_ts(datetime.utcnow()), "inline": False}
         ]
-        if message.author:
-            fields.insert(0, {"name": "User ID", "value": str(message.author.id), "inline": True})
-            fields.insert(0, {"name": "Author", "value": f"<@{message.author.id}>", "inline": True})
+        if snapshot.author_id:
+            fields.insert(0, {"name": "User ID", "value": str(snapshot.author_id), "inline": True})
+            fields.insert(0, {"name": "Author", "value": f"<@{snapshot.author_id}>", "inline": True})
 
         embed_data = {
-            "title": f"Message Deleted in #{channel_name}",
-            "description": message.content[:2000] if message.content else "*Content not cached*",
+            "title": template["titles"]["delete"],
+            "description": snapshot.content[:2000] if snapshot.content else "*Content not cached*",
             "color": 0xef4444,
             "author": {
-                "name": author_display,
-                "icon_url": str(message.author.avatar.url) if message.author and message.author.avatar else None
+                "name": snapshot.author_name,
+                "icon_url": snapshot.author_avatar
             },
             "fields": fields
         }
 
         try:
-            avatar_url = message.guild.icon.url if message.guild and message.guild.icon else None
-
-            deleted_content = message.content or ""
-            inline_urls = extract_all_urls(deleted_content)
-            attachment_urls = set(att.url for att in message.attachments) if message.attachments else set()
-
-            extra_embeds = []
-            if config.get("log_embeds", True) and message.embeds:
-                for original_embed in message.embeds:
-                    ed = original_embed.to_dict()
-                    embed_type = ed.get("type", "")
-                    if embed_type in ("link", "image", "video", "gifv"):
-                        continue
-                    embed_url = ed.get("url", "")
-                    image_url = (ed.get("image") or {}).get("url", "")
-                    video_url = (ed.get("video") or {}).get("url", "")
-                    thumb_url = (ed.get("thumbnail") or {}).get("url", "")
-                    if any(u in attachment_urls for u in [embed_url, image_url, video_url, thumb_url]):
-                        continue
-                    extra_embeds.append(ed)
+            avatar_url = template["avatar_url"]
+
+            inline_urls = extract_all_urls(snapshot.content)
+            extra_embeds = list(snapshot.embeds) if config.get("log_embeds", True) else []
 
             downloaded_files = []
-            if config.get("log_attachments", True) and message.attachments:
-                results = await asyncio.gather(*[download_attachment(att) for att in message.attachments], return_exceptions=True)
-                for r in results:
-                    if not isinstance(r, Exception) and r and r[0] and r[1]:
-                        downloaded_files.append(r)
-
-            success = await run_in_thread(
-                send_webhook_message,
-                webhook_url=webhook_url,
+            if config.get("log_attachments", True) and snapshot.attachments:
+                if config.get("vault_enabled", False):
+                    downloaded_files = await vaulted_files(snapshot.attachments)
+                else:
+                    downloaded_files = [attachment_file(*att) for att in snapshot.attachments]
+
+            await deliver_to_source(
+                matched,
+                config,
                 embed_data=embed_data,
                 embeds=extra_embeds if extra_embeds else None,
                 username=server_name,
                 avatar_url=avatar_url,
-                files=downloaded_files[:10] if downloaded_files else None
+                files=downloaded_files or None,
+                batch=True,
+                order_key=str(channel.id),
+                urgent=urgent,
+                event="delete",
+                received_at=received_at
             )
 
-            for fp, _ in downloaded_files:
-                try:
-                    os.remove(fp)
-                except Exception:
-                    pass
-
-            if not success:
-                dest_id = matched.get("destination_channel_id")
-                new_url, new_id, new_token = await run_in_thread(create_webhook, dest_id, "Channel Logger")
-                if new_url:
-                    cfg = load_config()
-                    for s in cfg.get("sources", []):
-                        if s.get("webhook_url") == webhook_url:
-                            s["webhook_url"] = new_url
-                            s["webhook_id"] = new_id
-                            s["webhook_token"] = new_token
-                    save_config(cfg)
-                    await run_in_thread(send_webhook_message, webhook_url=new_url, embed_data=embed_data, embeds=extra_embeds if extra_embeds else None, username=server_name, avatar_url=avatar_url)
-
-            for i in range(10, len(downloaded_files), 10):
-                await run_in_thread(
-                    send_webhook_message,
-                    webhook_url=webhook_url,
-                    username=server_name,
-                    avatar_url=avatar_url,
-                    files=downloaded_files[i:i+10]
-                )
-
-            if inline_urls:
-                for url in inline_urls:
-                    await run_in_thread(send_webhook_message, webhook_url=webhook_url, content=url, username=server_name, avatar_url=avatar_url)
+            for chunk in pack_content(inline_urls):
+                await deliver_to_source(matched, config, content=chunk, username=server_name, avatar_url=avatar_url, order_key=str(channel.id), urgent=urgent)
         except Exception as e:
             print(f"Channel Logger | Error logging deleted message: {e}", type_="ERROR")
 
     @bot.listen('on_message_edit')
     async def log_edited(message_before, message_after):
-        config = load_config()
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
         if not config["enabled"] or not config.get("log_edited", True):
             return
         if message_before.content == message_after.content:
             return
 
-        current_channel_id, parent_channel_id, category_id = get_channel_context(message_after.channel)
-        current_server_id = str(message_after.guild.id) if message_after.guild else None
+        matched = resolve_source(message_after.channel, message_after.guild, routing)
+        if not matched:
+            return
+        update_recent_message(str(message_after.channel.id), message_after.id, message_after.content or "")
+        if not source_passes_filter(routing, matched, message_after):
+            return
+        edited_at = message_after.edited_at if message_after.edited_at else datetime.utcnow()
+        await send_edited_log(config, matched, message_after.channel, message_after.guild, snapshot_message(message_after), message_before.content, edited_at, received_at)
 
-        if current_channel_id in get_all_dest_channel_ids(config):
+    @bot.listen('on_raw_message_edit')
+    async def log_raw_edited(payload):
+        if payload.cached_message is not None or "content" not in payload.data:
+            return
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
+        if not config["enabled"] or not config.get("log_edited", True):
             return
 
-        matched = find_matched_source(config, current_channel_id, current_server_id, category_id, parent_channel_id)
+        channel = bot.get_channel(payload.channel_id)
+        if channel is None:
+            return
+        guild = bot.get_guild(payload.guild_id) if payload.guild_id else None
+        matched = resolve_source(channel, guild, routing)
         if not matched:
             return
-
+        before = get_recent_message(str(payload.channel_id), payload.message_id)
+        after_content = payload.data.get("content") or ""
+        if before is None or before.content == after_content:
+            return
+        update_recent_message(str(payload.channel_id), payload.message_id, after_content)
+        try:
+            edited_at = datetime.fromisoformat(payload.data["edited_timestamp"]).replace(tzinfo=None)
+        except (KeyError, TypeError, ValueError):
+            edited_at = datetime.utcnow()
+        await send_edited_log(config, matched, channel, guild, before._replace(content=after_content), before.content, edited_at, received_at)
+
+    WORD_PATTERN = re.compile(r"\s*\S+\s*|\s+")
+    MARKDOWN_PATTERN = re.compile(r"([\\*_~`|>])")
+    DIFF_CONTEXT_TOKENS = 6
+    DIFF_INLINE_CHARS = 4000
+
+    def escape_markdown(text):
+        return MARKDOWN_PATTERN.sub(r"\\\1", text)
+    DIFF_FIELD_LIMIT = 1024
+
+    def word_diff(before, after):
+        a = WORD_PATTERN.findall(before)
+        b = WORD_PATTERN.findall(after)
+        # Tokens carry their surrounding whitespace for rendering, but are compared on the word alone.
+        a_words = [token.strip() for token in a]
+        b_words = [token.strip() for token in b]
+        # Trimming the shared prefix and suffix first keeps typical edits linear; the matcher only sees the changed middle.
+        limit = min(len(a), len(b))
+        prefix = 0
+        while prefix < limit and a_words[prefix] == b_words[prefix]:
+            prefix += 1
+        suffix = 0
+        while suffix < limit - prefix and a_words[-1 - suffix] == b_words[-1 - suffix]:
+            suffix += 1
+        opcodes = [("equal", 0, prefix, 0, prefix)] if prefix else []
+        matcher = difflib.SequenceMatcher(None, a_words[prefix:len(a) - suffix], b_words[prefix:len(b) - suffix], autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            opcodes.append((tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix))
+        if suffix:
+            opcodes.append(("equal", len(a) - suffix, len(a), len(b) - suffix, len(b)))
+        return a, b, opcodes
+
+    def mark_change(text, marker):
+        stripped = text.strip()
+        if not stripped:
+            return text
+        lead = text[:len(text) - len(text.lstrip())]
+        trail = text[len(text.rstrip()):]
+        return f"{lead}{marker}{escape_markdown(stripped)}{marker}{trail}"
+
+    def render_change(removed, added):
+        removed = mark_change(removed, "~~") if removed else ""
+        added = mark_change(added, "**") if added else ""
+        return f"{removed} {added}" if removed and added and not removed[-1].isspace() else removed + added
+
+    def clip_diff_part(raw, room):
+        texts = raw[1:]
+        budget = room
+        while budget > 1:
+            # A short side keeps all of its text and the long side gets whatever is left.
+            caps, left = {}, budget
+            for n, i in enumerate(sorted(range(len(texts)), key=lambda i: len(texts[i]))):
+                caps[i] = min(len(texts[i]), left // (len(texts) - n))
+                left -= caps[i]
+            clipped = [_clip(text, max(caps[i], 1)) for i, text in enumerate(texts)]
+            part = escape_markdown(clipped[0]) if raw[0] == "equal" else render_change(*clipped)
+            if len(part) <= room:
+                return part
+            budget -= max(len(part) - room, 1)
+        return ""
+
+    def render_word_diff(before, after):
+        a, b, opcodes = word_diff(before, after)
+        parts, raws = [], []
+        last = len(opcodes) - 1
+        for index, (tag, i1, i2, j1, j2) in enumerate(opcodes):
+            if tag == "equal":
+                # Unchanged words are shown with the new spacing, so whitespace-only edits don't render as changes.
+                segment = b[j1:j2]
+                if index == 0 and len(segment) > DIFF_CONTEXT_TOKENS:
+                    text = "… " + "".join(segment[-DIFF_CONTEXT_TOKENS:])
+                elif index == last and len(segment) > DIFF_CONTEXT_TOKENS:
+                    text = "".join(segment[:DIFF_CONTEXT_TOKENS]) + " …"
+                elif 0 < index < last and len(segment) > 2 * DIFF_CONTEXT_TOKENS:
+                    text = "".join(segment[:DIFF_CONTEXT_TOKENS]) + " … " + "".join(segment[-DIFF_CONTEXT_TOKENS:])
+                else:
+                    text = "".join(segment)
+                parts.append(escape_markdown(text))
+                raws.append(("equal", text))
+                continue
+            removed, added = "".join(a[i1:i2]), "".join(b[j1:j2])
+            parts.append(render_change(removed, added))
+            raws.append(("change", removed, added))
+        rendered = "".join(parts)
+        if len(rendered) <= DIFF_FIELD_LIMIT:
+            return rendered, False
+        note = "\n*… diff truncated, full before/after attached*"
+        budget = DIFF_FIELD_LIMIT - len(note)
+        kept, size = [], 0
+        for part, raw in zip(parts, raws):
+            if size + len(part) > budget:
+                # The hunk that overflows is clipped rather than dropped, so a long rewrite still shows what changed.
+                kept.append(clip_diff_part(raw, budget - size))
+                break
+            kept.append(part)
+            size += len(part)
+        return "".join(kept) + note, True
+
+    async def send_edited_log(config, matched, channel, guild, snapshot, before_content, edited_at, received_at):
         webhook_url = matched.get("webhook_url")
         if not webhook_url:
             return
+        if route_to_local_sink(matched, local_event("edit", guild, channel, snapshot, before=before_content, edited_at=calendar.timegm(edited_at.timetuple()))):
+            return
 
-        server_name = message_after.guild.name if message_after.guild else "Direct Message"
-        channel_name = get_channel_display_name(message_after.channel)
-        message_link = f"https://discord.com/channels/{message_after.guild.id if message_after.guild else '@me'}/{message_after.channel.id}/{message_after.id}"
-        edited_at = message_after.edited_at if message_after.edited_at else datetime.utcnow()
-        author_display = message_after.author.name
-        if hasattr(message_after.author, 'discriminator') and message_after.author.discriminator and message_after.author.discriminator != '0':
-            author_display = f"{message_after.author.name}#{message_after.author.discriminator}"
+        template = channel_template(channel, guild)
+        server_name = template["server_name"]
 
         embed_data = {
-            "title": f"Message Edited in #{channel_name}",
+            "title": template["titles"]["edit"],
             "color": 0xf59e0b,
             "author": {
-                "name": author_display,
-                "icon_url": str(message_after.author.avatar.url) if message_after.author.avatar else None
+                "name": snapshot.author_name,
+                "icon_url": snapshot.author_avatar
             },
             "fields": [
-                {"name": "Author", "value": f"<@{message_after.author.id}>", "inline": True},
-                {"name": "User ID", "value": str(message_after.author.id), "inline": True},
-                {"name": "Channel", "value": f"<#{current_channel_id}>", "inline": True},
-                {"name": "Before", "value": message_before.content[:1024] if message_before.content else "*Not cached*", "inline": False},
-                {"name": "After", "value": message_after.content[:1024] if message_after.content else "*Empty*", "inline": False},
-                {"name": "Message Link", "value": f"[Jump to Message]({message_link})", "inline": True},
+                {"name": "Author", "value": f"<@{snapshot.author_id}>", "inline": True},
+                {"name": "User ID", "value": str(snapshot.author_id), "inline": True},
+                template["channel_field"],
+                {"name": "Message Link", "value": f"[Jump to Message]({template['link_prefix']}{snapshot.id})", "inline": True},
                 {"name": "Edited", "value": discord_ts(edited_at), "inline": True}
             ]
         }
 
+        full_copy = None
+        if before_content and snapshot.content:
+            if len(before_content) + len(snapshot.content) > DIFF_INLINE_CHARS:
+                diff_text, truncated = await run_in_thread(render_word_diff, before_content, snapshot.content)
+            else:
+                diff_text, truncated = render_word_diff(before_content, snapshot.content)
+            embed_data["fields"].insert(3, {"name": "Changes", "value": diff_text or "*Whitespace only*", "inline": False})
+            if truncated:
+                full_copy = [attachment_data(f"edit-{snapshot.id}.txt", f"Before:\n{before_content}\n\nAfter:\n{snapshot.content}\n".encode())]
+        else:
+            embed_data["fields"][3:3] = [
+                {"name": "Before", "value": before_content[:1024] if before_content else "*Not cached*", "inline": False},
+                {"name": "After", "value": snapshot.content[:1024] if snapshot.content else "*Empty*", "inline": False}
+            ]
+
         try:
-            avatar_url = message_after.guild.icon.url if message_after.guild and message_after.guild.icon else None
-            success = await run_in_thread(send_webhook_message, webhook_url=webhook_url, embed_data=embed_data, username=server_name, avatar_url=avatar_url)
-            if not success:
-                dest_id = matched.get("destination_channel_id")
-                new_url, new_id, new_token = await run_in_thread(create_webhook, dest_id, "Channel Logger")
-                if new_url:
-                    cfg = load_config()
-                    for s in cfg.get("sources", []):
-                        if s.get("webhook_url") == webhook_url:
-                            s["webhook_url"] = new_url
-                            s["webhook_id"] = new_id
-                            s["webhook_token"] = new_token
-                    save_config(cfg)
-                    await run_in_thread(send_webhook_message, webhook_url=new_url, embed_data=embed_data, username=server_name, avatar_url=avatar_url)
+            await deliver_to_source(matched, config, embed_data=embed_data, username=server_name, avatar_url=template["avatar_url"], files=full_copy, batch=True, order_key=str(channel.id), urgent=digest_active(matched), event="edit", received_at=received_at)
         except Exception as e:
             print(f"Channel Logger | Error logging edited message: {e}", type_="ERROR")
 
-    @bot.listen('on_bulk_message_delete')
-    async def log_bulk_deleted(messages):
-        config = load_config()
+    TRANSCRIPT_GZIP_THRESHOLD = 512 * 1024
+
+    def build_bulk_transcript(channel_name, cached, uncached_ids):
+        # Lines go straight into one buffer, so a purge of thousands of messages is a single linear pass.
+        buffer = io.BytesIO()
+        write = buffer.write
+        write(f"Bulk delete transcript for #{channel_name}\n{len(cached)} cached, {len(uncached_ids)} not cached\n\n".encode())
+        for m in cached:
+            stamp = datetime.utcfromtimestamp(m.created_at).strftime("%Y-%m-%d %H:%M:%S UTC")
+            write(f"[{stamp}] {m.author_name} ({m.author_id}) message {m.id}\n".encode())
+            if m.content:
+                write(("    " + m.content.replace("\n", "\n    ") + "\n").encode())
+            for filename, url, _ in m.attachments:
+                write(f"    attachment: {filename} {url}\n".encode())
+            write(b"\n")
+        if uncached_ids:
+            write(b"Not cached:\n")
+            write("\n".join(str(i) for i in uncached_ids).encode())
+            write(b"\n")
+        data = buffer.getvalue()
+        name = f"bulk-delete-{channel_name.replace(' ', '_')}-{int(time.time())}.txt"
+        if len(data) > TRANSCRIPT_GZIP_THRESHOLD:
+            return attachment_data(name + ".gz", gzip.compress(data, 6))
+        return attachment_data(name, data)
+
+    @bot.listen('on_raw_bulk_message_delete')
+    async def log_bulk_deleted(payload):
+        received_at = time.monotonic()
+        routing = get_routing()
+        config = routing["config"]
         if not config["enabled"] or not config.get("log_bulk_deleted", True):
             return
-        if not messages:
+        if not payload.message_ids:
             return
 
-        first = messages[0]
-        current_channel_id, parent_channel_id, category_id = get_channel_context(first.channel)
-        current_server_id = str(first.guild.id) if first.guild else None
-
-        if current_channel_id in get_all_dest_channel_ids(config):
+        channel = bot.get_channel(payload.channel_id)
+        if channel is None:
             return
-
-        matched = find_matched_source(config, current_channel_id, current_server_id, category_id, parent_channel_id)
+        guild = bot.get_guild(payload.guild_id) if payload.guild_id else None
+        matched = resolve_source(channel, guild, routing)
         if not matched:
             return
+        current_channel_id = str(channel.id)
 
         webhook_url = matched.get("webhook_url")
         if not webhook_url:
             return
 
-        server_name = first.guild.name if first.guild else "Direct Message"
-        channel_name = get_channel_display_name(first.channel)
-        cached = [m for m in messages if m.content or m.author]
+        # Messages still in discord.py's cache win; anything older comes from the recent-message cache.
+        discord_cached = {m.id: m for m in payload.cached_messages}
+        cached = []
+        uncached_ids = []
+        for message_id in sorted(payload.message_ids):
+            recent = pop_recent_message(current_channel_id, message_id)
+            if message_id in discord_cached:
+                cached.append(snapshot_message(discord_cached[message_id]))
+            elif recent is not None:
+                cached.append(recent)
+            else:
+                uncached_ids.append(message_id)
+        total_deleted = len(payload.message_ids)
+        if matched.get("sink", "webhook") != "webhook":
+            events = [local_event("delete", guild, channel, m, bulk=True) for m in cached]
+            events += [local_event("delete", guild, channel, None, bulk=True, message_id=str(i)) for i in uncached_ids]
+            local_only = False
+            for event in events:
+                local_only = route_to_local_sink(matched, event)
+            if local_only:
+                return
+
+        template = channel_template(channel, guild)
+        server_name = template["server_name"]
+        channel_name = template["channel_name"]
         summary_lines = []
         for m in cached[:20]:
-            author_name = m.author.name if m.author else "Unknown"
-            preview = (m.content[:80] + "...") if m.content and len(m.content) > 80 else (m.content or "*No content*")
-            summary_lines.append(f"**{author_name}**: {preview}")
+            preview = (m.content[:80] + "...") if len(m.content) > 80 else (m.content or "*No content*")
+            summary_lines.append(f"**{m.author_name}**: {preview}")
         if len(cached) > 20:
             summary_lines.append(f"*... and {len(cached) - 20} more cached messages*")
 
         embed_data = {
-            "title": f"Bulk Delete in #{channel_name}",
+            "title": template["titles"]["bulk"],
             "description": ("\n".join(summary_lines) if summary_lines else "*No cached content available*")[:2000],
             "color": 0xdc2626,
             "fields": [
-                {"name": "Total Deleted", "value": str(len(messages)), "inline": True},
+                {"name": "Total Deleted", "value": str(total_deleted), "inline": True},
                 {"name": "Cached", "value": str(len(cached)), "inline": True},
-                {"name": "Not Cached", "value": str(len(messages) - len(cached)), "inline": True},
-                {"name": "Channel", "value": f"<#{current_channel_id}>", "inline": True},
+                {"name": "Not Cached", "value": str(total_deleted - len(cached)), "inline": True},
+                template["channel_field"],
                 {"name": "Deleted At", "value": discord_ts(datetime.utcnow()), "inline": True}
             ]
         }
 
         try:
-            avatar_url = first.guild.icon.url if first.guild and first.guild.icon else None
-            success = await run_in_thread(send_webhook_message, webhook_url=webhook_url, embed_data=embed_data, username=server_name, avatar_url=avatar_url)
-            if not success:
-                dest_id = matched.get("destination_channel_id")
-                new_url, new_id, new_token = await run_in_thread(create_webhook, dest_id, "Channel Logger")
-                if new_url:
-                    cfg = load_config()
-                    for s in cfg.get("sources", []):
-                        if s.get("webhook_url") == webhook_url:
-                            s["webhook_url"] = new_url
-                            s["webhook_id"] = new_id
-                            s["webhook_token"] = new_token
-                    save_config(cfg)
-                    await run_in_thread(send_webhook_message, webhook_url=new_url, embed_data=embed_data, username=server_name, avatar_url=avatar_url)
+            avatar_url = template["avatar_url"]
+            transcript = [build_bulk_transcript(channel_name, cached, uncached_ids)] if cached and config.get("bulk_transcripts", True) else None
+            await deliver_to_source(matched, config, embed_data=embed_data, username=server_name, avatar_url=avatar_url, files=transcript, order_key=current_channel_id, urgent=digest_active(matched), event="bulk", received_at=received_at)
         except Exception as e:
             print(f"Channel Logger | Error logging bulk delete: {e}", type_="ERROR")
 
+    @bot.listen('on_raw_reaction_add')
+    async def log_reaction_add(payload):
+        collect_reaction(payload, True)
+
+    @bot.listen('on_raw_reaction_remove')
+    async def log_reaction_remove(payload):
+        collect_reaction(payload, False)
+
+    @bot.listen('on_guild_channel_update')
+    async def invalidate_route_memo(before, after):
+        if getattr(before, "category_id", None) != getattr(after, "category_id", None):
+            _routing["memo"].clear()
+
+    BACKFILL_FILE = BASE_DIR / "ChannelLoggerBackfill.json"
+    BACKFILL_CONCURRENCY = 3
+    BACKFILL_CHECKPOINT_EVERY = 50
+    BACKFILL_WINDOW = 20
+    BACKFILL_MAX_LIMIT = 5000
+    _backfill = {"state": None, "tasks": {}, "lock": None, "semaphore": None}
+
+    def load_backfill_state():
+        try:
+            with open(BACKFILL_FILE, "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write_backfill_state(data):
+        tmp = BACKFILL_FILE.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            f.write(data)
+        os.replace(tmp, BACKFILL_FILE)
+
+    async def persist_backfill():
+        if _backfill["lock"] is None:
+            _backfill["lock"] = asyncio.Lock()
+        async with _backfill["lock"]:
+            await run_in_thread(write_backfill_state, json.dumps(_backfill["state"], indent=4))
+
+    def backfill_targets(source):
+        dest_ids = get_routing()["dest_ids"]
+        return [c for c in _backfill_channels(source) if str(c.id) not in dest_ids]
+
+    def _backfill_channels(source):
+        stype, sid = source.get("type"), source.get("id")
+        if stype in ("channel", "thread"):
+            channel = bot.get_channel(int(sid))
+            if channel is None:
+                return []
+            return get_active_forum_threads(channel) if is_forum_channel(channel) else [channel]
+        if stype == "category":
+            guild = bot.get_guild(int(source.get("server_id")))
+            return [c for c in guild.text_channels if str(c.category_id) == sid] if guild else []
+        if stype == "server":
+            guild = bot.get_guild(int(sid))
+            return list(guild.text_channels) if guild else []
+        return []
+
+    def backfill_summary():
+        jobs = (_backfill["state"] or {}).values()
+        running = [job for job in jobs if not job.get("finished")]
+        if not running:
+            return None
+        channels = sum(len(job["channels"]) for job in running)
+        done = sum(1 for job in running for cursor in job["channels"].values() if cursor == "done")
+        logged = sum(job["logged"] for job in running)
+        return f"Backfill: {len(running)} running · {logged} messages · {done}/{channels} channels"
+
+    async def settle_backfill_message(job, cid, message, task):
+        await task
+        job["channels"][cid] = str(message.id)
+        job["counts"][cid] = job["counts"].get(cid, 0) + 1
+        job["logged"] += 1
+        if job["logged"] % BACKFILL_CHECKPOINT_EVERY == 0:
+            await persist_backfill()
+            update_backfill_text()
+
+    async def backfill_channel(job, channel):
+        cid = str(channel.id)
+        cursor = job["channels"].get(cid)
+        if cursor == "done":
+            return
+        async with _backfill["semaphore"]:
+            remaining = job["limit"] - job["counts"].get(cid, 0)
+            before = discord.Object(id=job["until"])
+            try:
+                if cursor:
+                    history = channel.history(limit=remaining, after=discord.Object(id=int(cursor)), before=before, oldest_first=True)
+                    messages = [m async for m in history]
+                else:
+                    # The newest N before the cutoff, replayed oldest first; live messages after the cutoff are logged normally.
+                    messages = [m async for m in channel.history(limit=remaining, before=before)]
+                    messages.reverse()
+                # A window of logs stays in flight so embed batches can fill; each enqueues before its first await,
+                # so delivery keeps history order. The cursor only advances past logs that have completed, oldest first.
+                loop = asyncio.get_event_loop()
+                inflight = deque()
+                for message in messages:
+                    inflight.append((message, loop.create_task(log_message(message, backfill=True))))
+                    while len(inflight) >= BACKFILL_WINDOW or (inflight and inflight[0][1].done()):
+                        await settle_backfill_message(job, cid, *inflight.popleft())
+                while inflight:
+                    await settle_backfill_message(job, cid, *inflight.popleft())
+            except (discord.Forbidden, discord.HTTPException) as e:
+                print(f"Channel Logger | Backfill skipped #{getattr(channel, 'name', cid)}: {e}", type_="ERROR")
+            job["channels"][cid] = "done"
+            await persist_backfill()
+            update_backfill_text()
+
+    async def run_backfill(key, source):
+        if _backfill["semaphore"] is None:
+            _backfill["semaphore"] = asyncio.Semaphore(BACKFILL_CONCURRENCY)
+        job = _backfill["state"][key]
+        try:
+            channels = backfill_targets(source)
+            for channel in channels:
+                job["channels"].setdefault(str(channel.id), None)
+            await persist_backfill()
+            update_backfill_text()
+            await asyncio.gather(*(backfill_channel(job, channel) for channel in channels))
+            job["finished"] = True
+            await persist_backfill()
+            print(f"Channel Logger | Backfill for {source_label(source)} finished: {job['logged']} messages.", type_="INFO")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Channel Logger | Backfill error: {e}", type_="ERROR")
+        finally:
+            _backfill["tasks"].pop(key, None)
+            update_backfill_text()
+
+    def start_backfill(source, limit):
+        if _backfill["state"] is None:
+            _backfill["state"] = load_backfill_state()
+        key = f"{source.get('type')}:{source.get('id')}"
+        _backfill["state"][key] = {
+            "limit": min(max(int(limit), 1), BACKFILL_MAX_LIMIT), "until": discord.utils.time_snowflake(discord.utils.utcnow()),
+            "channels": {}, "counts": {}, "logged": 0, "finished": False
+        }
+        _backfill["tasks"][key] = bot.loop.create_task(run_backfill(key, source))
+
+    async def resume_backfills():
+        _backfill["state"] = await run_in_thread(load_backfill_state)
+        sources = {f"{s.get('type')}:{s.get('id')}": s for s in load_config().get("sources", [])}
+        for key, job in list(_backfill["state"].items()):
+            if key not in sources:
+                del _backfill["state"][key]
+            elif not job.get("finished") and key not in _backfill["tasks"]:
+                print(f"Channel Logger | Resuming backfill for {source_label(sources[key])}.", type_="INFO")
+                _backfill["tasks"][key] = bot.loop.create_task(run_backfill(key, sources[key]))
+        update_backfill_text()
+
     async def validate_all_webhooks():
         try:
             config = load_config()
-            seen = {}
-            changed = False
+            size = min(max(int(config.get("webhooks_per_destination", 1)), 1), MAX_WEBHOOKS_PER_DESTINATION)
+            groups = {}
             for source in config.get("sources", []):
-                wh_url = source.get("webhook_url")
-                dest_id = source.get("destination_channel_id")
-                if not wh_url or not dest_id:
-                    continue
-                if wh_url in seen:
-                    if seen[wh_url]:
-                        source["webhook_url"] = seen[wh_url]["url"]
-                        source["webhook_id"] = seen[wh_url]["id"]
-                        source["webhook_token"] = seen[wh_url]["token"]
-                    continue
-                valid = await run_in_thread(validate_webhook, wh_url)
-                if not valid:
-                    print(f"Channel Logger | Invalid webhook for dest {dest_id}, recreating...", type_="INFO")
-                    new_url, new_id, new_token = await run_in_thread(create_webhook, dest_id, "Channel Logger")
-                    if new_url:
-                        seen[wh_url] = {"url": new_url, "id": new_id, "token": new_token}
-                        source["webhook_url"] = new_url
-                        source["webhook_id"] = new_id
-                        source["webhook_token"] = new_token
-                        changed = True
-                    else:
-                        seen[wh_url] = None
-                else:
-                    seen[wh_url] = None
+                if source.get("webhook_url") and source.get("destination_channel_id"):
+                    groups.setdefault((source["destination_channel_id"], source["webhook_url"]), []).append(source)
+            changed = False
+            for (dest_id, wh_url), members in groups.items():
+                first = members[0]
+                entries = [{"webhook_url": wh_url, "webhook_id": first.get("webhook_id"), "webhook_token": first.get("webhook_token")}]
+                entries += [dict(w) for w in first.get("webhook_pool", []) if w.get("webhook_url")]
+                for extra in entries[size:]:
+                    if extra.get("webhook_id") and extra.get("webhook_token"):
+                        await delete_webhook(extra["webhook_id"], extra["webhook_token"])
+                entries = entries[:size]
+                valid = await asyncio.gather(*(validate_webhook(e["webhook_url"]) for e in entries))
+                pool = []
+                for i, (entry, ok) in enumerate(zip(entries, valid)):
+                    if not ok:
+                        print(f"Channel Logger | Invalid webhook for dest {dest_id}, recreating...", type_="INFO")
+                        new_url, new_id, new_token = await create_webhook(dest_id, "Channel Logger")
+                        if new_url:
+                            _metrics["webhook_recreations"] += 1
+                            entry = {"webhook_url": new_url, "webhook_id": new_id, "webhook_token": new_token}
+                        elif i:
+                            continue
+                    pool.append(entry)
+                while len(pool) < size:
+                    new_url, new_id, new_token = await create_webhook(dest_id, "Channel Logger")
+                    if not new_url:
+                        break
+                    pool.append({"webhook_url": new_url, "webhook_id": new_id, "webhook_token": new_token})
+                if pool[0]["webhook_url"] != wh_url or pool[1:] != first.get("webhook_pool", []):
+                    changed = True
+                    for source in members:
+                        source.update(pool[0])
+                        source["webhook_pool"] = [dict(w) for w in pool[1:]]
             if changed:
                 save_config(config)
                 print("Channel Logger | Webhooks validated and updated.", type_="INFO")
@@ -1127,10 +3552,63 @@ def ChannelLogger():
     log_bulk_toggle.checked = config.get("log_bulk_deleted", True)
     log_embeds_toggle.checked = config.get("log_embeds", True)
     log_attachments_toggle.checked = config.get("log_attachments", True)
+    batch_toggle.checked = config.get("batch_embeds", False)
+    batch_window_input.value = str(config.get("batch_window_ms", 500))
+    batch_max_input.value = str(config.get("batch_max_embeds", 10))
+    cache_budget_input.value = str(config.get("message_cache_mb", 32))
+    upload_limit_input.value = str(config.get("upload_limit_mb", 10))
+    dedup_toggle.checked = config.get("dedup_enabled", False)
+    transcript_toggle.checked = config.get("bulk_transcripts", True)
+    vault_toggle.checked = config.get("vault_enabled", False)
+    sink_format_select.selected_items = [config.get("local_sink_format", "jsonl")]
+    retention_days_input.value = str(config.get("local_retention_days", 30))
+    retention_mb_input.value = str(config.get("local_retention_mb", 512))
+    sink_mode_select.selected_items = ["webhook"]
+    vault_budget_input.value = str(config.get("vault_budget_mb", 256))
+    vault_max_input.value = str(config.get("vault_max_file_mb", 25))
+    dedup_window_input.value = str(config.get("dedup_window", 30))
+    reactions_toggle.checked = config.get("log_reactions", False)
+    reaction_window_input.value = str(config.get("reaction_window", 30))
+    digest_toggle.checked = config.get("digest_enabled", False)
+    digest_threshold_input.value = str(config.get("digest_threshold", 10))
+    digest_interval_input.value = str(config.get("digest_interval", 10))
+    shard_count_input.value = str(config.get("webhooks_per_destination", 1))
+    shard_strategy_select.selected_items = [config.get("shard_strategy", "least_loaded")]
+
+    async def shutdown():
+        if _spool["drainer"]:
+            _spool["drainer"].cancel()
+        for task in list(_backfill["tasks"].values()):
+            task.cancel()
+        if _backfill["state"]:
+            await persist_backfill()
+        try:
+            await asyncio.wait_for(asyncio.gather(flush_all_digests(), flush_reactions(final=True)), 5)
+        except asyncio.TimeoutError:
+            pass
+        await stop_delivery_workers()
+        await asyncio.sleep(0.1)  # let handlers woken by the drained queues spool their payloads
+        await flush_spool()
+        await save_vault_index()
+        try:
+            await asyncio.wait_for(close_local_sink(), 5)
+        except asyncio.TimeoutError:
+            pass
+        await close_http_session()
+
+    # Nighty has no unload hook, so a reload tears down the previous instance's resources.
+    previous_shutdown = getattr(bot, "_channel_logger_shutdown", None)
+    previous_shutdown_task = bot.loop.create_task(previous_shutdown()) if previous_shutdown else None
+    bot._channel_logger_shutdown = shutdown
 
     tab.render()
     hydrate_dropdowns()
+    bot.loop.create_task(get_http_session())
     bot.loop.create_task(validate_all_webhooks())
+    if config.get("vault_enabled", False):
+        bot.loop.create_task(load_vault())
+    bot.loop.create_task(resume_backfills())
+    _spool["drainer"] = bot.loop.create_task(spool_drainer(previous_shutdown_task))
 
     last_sid = [None]
 
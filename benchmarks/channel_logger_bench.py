@@ -0,0 +1,797 @@
+"""Throughput benchmark for ChannelLogger.py.
+
+Loads the script against stub bot/Tab/UI/getScriptsPath objects, replays a synthetic stream of
+message, edit, delete and bulk-delete events, and points every webhook at a local aiohttp server
+that answers like Discord's webhook endpoint (rate-limit headers, 429s, ?wait=true).
+
+    python benchmarks/channel_logger_bench.py --events 5000 --sources 20 --attachment-kb 256 --rate 500
+
+Only aiohttp is required; discord.py is replaced by a stub module for the duration of the run.
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from aiohttp import web
+
+SCRIPT = Path(__file__).resolve().parent.parent / "ChannelLogger.py"
+TOKEN_PATTERN = re.compile(r"bx(\d+)z")
+GUILD_ID = 100
+DEST_CHANNEL_ID = 900
+
+
+# --- discord / Nighty stubs ---
+
+class Asset:
+    def __init__(self, url):
+        self.url = url
+
+
+class User:
+    def __init__(self, id, name, bot=False):
+        self.id = id
+        self.name = name
+        self.discriminator = "0"
+        self.avatar = Asset(f"https://cdn.discordapp.com/avatars/{id}/a.png")
+        self.bot = bot
+
+
+class Channel:
+    def __init__(self, id, name, guild, category_id=None):
+        self.id = id
+        self.name = name
+        self.guild = guild
+        self.category_id = category_id
+        self.threads = []
+
+
+class TextChannel(Channel):
+    pass
+
+
+class ForumChannel(Channel):
+    pass
+
+
+class CategoryChannel(Channel):
+    channels = []
+
+
+class Thread(Channel):
+    def __init__(self, id, name, guild, parent):
+        super().__init__(id, name, guild)
+        self.parent = parent
+        self.parent_id = parent.id
+
+
+class Guild:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+        self.icon = Asset(f"https://cdn.discordapp.com/icons/{id}/i.png")
+        self.channels = []
+        self.categories = []
+        self._by_id = {}
+
+    def add(self, channel):
+        self.channels.append(channel)
+        self._by_id[channel.id] = channel
+        return channel
+
+    @property
+    def text_channels(self):
+        return [c for c in self.channels if isinstance(c, TextChannel)]
+
+    def get_channel(self, channel_id):
+        return self._by_id.get(channel_id)
+
+    def get_member(self, user_id):
+        return None
+
+
+class Attachment:
+    def __init__(self, id, filename, url, size):
+        self.id = id
+        self.filename = filename
+        self.url = url
+        self.size = size
+
+
+class Message:
+    def __init__(self, id, channel, author, content, attachments=()):
+        self.id = id
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.attachments = list(attachments)
+        self.embeds = []
+        self.created_at = datetime.now(timezone.utc)
+        self.edited_at = None
+
+
+def install_discord_stub():
+    module = types.ModuleType("discord")
+    module.TextChannel = TextChannel
+    module.ForumChannel = ForumChannel
+    module.CategoryChannel = CategoryChannel
+    module.Thread = Thread
+    module.Object = lambda id: types.SimpleNamespace(id=id)
+    module.Forbidden = type("Forbidden", (Exception,), {})
+    module.HTTPException = type("HTTPException", (Exception,), {})
+    module.utils = types.SimpleNamespace(
+        utcnow=lambda: datetime.now(timezone.utc),
+        time_snowflake=lambda dt, high=False: int(dt.timestamp() * 1000 - 1420070400000) << 22
+    )
+    sys.modules["discord"] = module
+
+
+class Element:
+    def __init__(self, **kwargs):
+        self.visible = True
+        self.checked = False
+        self.value = ""
+        self.content = ""
+        self.items = []
+        self.selected_items = []
+        self.disabled_items = []
+        self.loading = False
+        self.__dict__.update(kwargs)
+
+    def create_container(self, **kwargs):
+        return Element(**kwargs)
+
+    def create_card(self, **kwargs):
+        return Element(**kwargs)
+
+    def create_group(self, **kwargs):
+        return Element(**kwargs)
+
+    def create_ui_element(self, kind, **kwargs):
+        return Element(kind=kind, **kwargs)
+
+
+class Tab(Element):
+    def render(self):
+        pass
+
+    def toast(self, **kwargs):
+        pass
+
+
+class Bot:
+    def __init__(self, loop):
+        self.loop = loop
+        self.user = User(1, "bench-self")
+        self.http = types.SimpleNamespace(token="bench")
+        self.guilds = []
+        self.listeners = {}
+        self.pending = set()
+
+    def listen(self, name):
+        def decorator(func):
+            self.listeners.setdefault(name, []).append(func)
+            return func
+        return decorator
+
+    def get_guild(self, guild_id):
+        for guild in self.guilds:
+            if guild.id == guild_id:
+                return guild
+        return None
+
+    def get_channel(self, channel_id):
+        for guild in self.guilds:
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                return channel
+        return None
+
+    def dispatch(self, name, *args):
+        # Like discord.py, each listener runs as its own task so slow handlers don't block the gateway.
+        for func in self.listeners.get(name, []):
+            task = self.loop.create_task(func(*args))
+            self.pending.add(task)
+            task.add_done_callback(self.pending.discard)
+
+
+def load_channel_logger(bot, scripts_dir, log):
+    def nighty_print(*args, type_=None, **kwargs):
+        log.append((type_, " ".join(str(a) for a in args)))
+
+    socketio = types.SimpleNamespace(on=lambda event: (lambda func: func))
+    namespace = {
+        "__name__": "channel_logger_bench", "bot": bot, "Tab": Tab,
+        "UI": types.SimpleNamespace(Text="text", Toggle="toggle", Button="button", Select="select", Input="input"),
+        "getScriptsPath": lambda: str(scripts_dir), "nightyScript": lambda **kwargs: (lambda func: func),
+        "print": nighty_print, "socketio": socketio, "request": types.SimpleNamespace(sid=None)
+    }
+    exec(compile(SCRIPT.read_text(encoding="utf-8"), str(SCRIPT), "exec"), namespace)
+    return namespace
+
+
+def install_theme(appdata):
+    nighty_dir = Path(appdata) / "Nighty Selfbot"
+    (nighty_dir / "data" / "themes").mkdir(parents=True)
+    (nighty_dir / "nighty.config").write_text(json.dumps({"theme": "bench"}))
+    theme = {"color": "#5865F2", "small_image": "https://cdn.discordapp.com/embed/avatars/0.png", "large_image": "https://cdn.discordapp.com/embed/avatars/1.png"}
+    (nighty_dir / "data" / "themes" / "bench.json").write_text(json.dumps(theme))
+    os.environ["APPDATA"] = str(appdata)
+
+
+def closure_of(func):
+    return {name: cell.cell_contents for name, cell in zip(func.__code__.co_freevars, func.__closure__ or ())}
+
+
+def script_scope(bot):
+    # Every closure-level name reachable from the registered listeners.
+    scope, pending, seen = {}, [func for funcs in bot.listeners.values() for func in funcs], set()
+    while pending:
+        func = pending.pop()
+        if id(func) in seen or func.__closure__ is None:
+            continue
+        seen.add(id(func))
+        for name, cell in zip(func.__code__.co_freevars, func.__closure__):
+            try:
+                value = cell.cell_contents
+            except ValueError:
+                continue
+            scope.setdefault(name, value)
+            if isinstance(value, types.FunctionType):
+                pending.append(value)
+    return scope
+
+
+def replace_free_var(func, name, value):
+    cell = func.__closure__[func.__code__.co_freevars.index(name)]
+    previous, cell.cell_contents = cell.cell_contents, value
+    return previous
+
+
+# --- local Discord stand-in ---
+
+class WebhookStandIn:
+    def __init__(self, limit, window):
+        self.limit = limit
+        self.window = window
+        self.buckets = {}
+        self.acked = {}
+        self.requests = 0
+        self.rate_limited = 0
+        self.bytes_received = 0
+        self.next_message_id = 1
+        self.blobs = {}
+
+    def app(self):
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/api/webhooks/{id}/{token}", self.webhook)
+        app.router.add_route("*", "/api/webhooks/{id}/{token}/messages/{message_id}", self.webhook)
+        app.router.add_get("/cdn/{size}/{name}", self.cdn)
+        return app
+
+    def rate_limit_headers(self, bucket, now):
+        reset_after = max(bucket["reset"] - now, 0.0)
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.limit - bucket["count"], 0)),
+            "X-RateLimit-Reset": f"{time.time() + reset_after:.3f}",
+            "X-RateLimit-Reset-After": f"{reset_after:.3f}",
+            "X-RateLimit-Bucket": bucket["id"]
+        }
+
+    async def webhook(self, request):
+        webhook_id = request.match_info["id"]
+        if request.method == "GET":
+            return web.json_response({"id": webhook_id, "token": request.match_info["token"], "channel_id": str(DEST_CHANNEL_ID)})
+        if request.method == "DELETE":
+            return web.Response(status=204)
+
+        now = time.monotonic()
+        bucket = self.buckets.setdefault(webhook_id, {"id": f"bench-{webhook_id}", "count": 0, "reset": now + self.window})
+        if now >= bucket["reset"]:
+            bucket["count"] = 0
+            bucket["reset"] = now + self.window
+        if self.limit and bucket["count"] >= self.limit:
+            self.rate_limited += 1
+            retry_after = bucket["reset"] - now
+            headers = self.rate_limit_headers(bucket, now)
+            headers["Retry-After"] = f"{retry_after:.3f}"
+            return web.json_response({"message": "You are being rate limited.", "retry_after": retry_after, "global": False}, status=429, headers=headers)
+        bucket["count"] += 1
+
+        payload = {}
+        if request.content_type.startswith("multipart/"):
+            reader = await request.multipart()
+            while True:
+                part = await reader.next()
+                if part is None:
+                    break
+                data = await part.read()
+                self.bytes_received += len(data)
+                if part.name == "payload_json":
+                    payload = json.loads(data)
+        else:
+            body = await request.read()
+            self.bytes_received += len(body)
+            payload = json.loads(body) if body else {}
+        self.requests += 1
+        self.record(payload, time.perf_counter())
+
+        headers = self.rate_limit_headers(bucket, now)
+        if request.query.get("wait") == "true" or request.method == "PATCH":
+            self.next_message_id += 1
+            return web.json_response({"id": str(self.next_message_id)}, headers=headers)
+        return web.Response(status=204, headers=headers)
+
+    def record(self, payload, received_at):
+        for embed in payload.get("embeds") or []:
+            title = embed.get("title") or ""
+            if title.startswith("Message Deleted"):
+                kind = "delete"
+            elif title.startswith("Message Edited"):
+                kind = "edit"
+            elif title.startswith("Bulk Delete"):
+                kind = "bulk"
+            elif title.startswith("#"):
+                kind = "message"
+            else:
+                continue
+            for token in TOKEN_PATTERN.findall(json.dumps(embed)):
+                self.acked.setdefault((kind, int(token)), received_at)
+
+    async def cdn(self, request):
+        size = int(request.match_info["size"])
+        blob = self.blobs.get(size)
+        if blob is None:
+            blob = self.blobs[size] = random.Random(size).randbytes(size)
+        return web.Response(body=blob, content_type="application/octet-stream")
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def submit(self, fn, *args, **kwargs):
+        with self.lock:
+            self.submitted += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._finished)
+        return future
+
+    def _finished(self, future):
+        with self.lock:
+            self.active -= 1
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+    except Exception:
+        return None
+
+
+def percentile(values, fraction):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+# --- workload ---
+
+def build_world(bot, source_count):
+    guild = Guild(GUILD_ID, "Bench Guild")
+    guild.add(TextChannel(DEST_CHANNEL_ID, "logs", guild))
+    channels = [guild.add(TextChannel(1000 + i, f"source-{i}", guild)) for i in range(source_count)]
+    bot.guilds.append(guild)
+    return guild, channels
+
+
+def build_config(args, base_url, channels):
+    sources = []
+    for index, channel in enumerate(channels):
+        webhook_id = str(index + 1)
+        sources.append({
+            "type": "channel", "id": str(channel.id), "server_id": str(GUILD_ID),
+            "destination_channel_id": str(DEST_CHANNEL_ID),
+            "webhook_url": f"{base_url}/api/webhooks/{webhook_id}/bench",
+            "webhook_id": webhook_id, "webhook_token": "bench"
+        })
+    config = {
+        "enabled": True, "log_self": False, "notify_on_log": False, "ping_on_log": False,
+        "log_on_send": True, "log_deleted": True, "log_edited": True, "log_embeds": True,
+        "log_attachments": True, "log_bulk_deleted": True, "batch_embeds": args.batch,
+        "sources": sources
+    }
+    config.update(json.loads(args.config))
+    return config
+
+
+async def replay(args, bot, base_url, channels):
+    rng = random.Random(args.seed)
+    authors = [User(10_000 + i, f"user{i}") for i in range(50)]
+    live = {channel.id: [] for channel in channels}
+    expected = {}
+    ids = iter(range(1_000_000, 10**12))
+    tokens = iter(range(1, 10**12))
+    counts = {"message": 0, "edit": 0, "delete": 0, "bulk": 0}
+    filler = "lorem ipsum dolor sit amet " * max(args.content_words // 5, 1)
+
+    def new_content(token):
+        return f"bx{token}z {filler}".strip()
+
+    start = time.perf_counter()
+    for i in range(args.events):
+        if args.rate:
+            delay = start + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        elif i % 64 == 0:
+            await asyncio.sleep(0)
+
+        channel = channels[i % len(channels)]
+        history = live[channel.id]
+        roll = rng.random()
+        if history and roll < args.edit_ratio:
+            index = rng.randrange(len(history))
+            before, _ = history[index]
+            token = next(tokens)
+            after = copy.copy(before)
+            after.content = new_content(token)
+            after.edited_at = datetime.now(timezone.utc)
+            history[index] = (after, token)
+            expected[("edit", token)] = time.perf_counter()
+            counts["edit"] += 1
+            bot.dispatch("on_message_edit", before, after)
+        elif history and roll < args.edit_ratio + args.delete_ratio:
+            message, token = history.pop(rng.randrange(len(history)))
+            expected[("delete", token)] = time.perf_counter()
+            counts["delete"] += 1
+            bot.dispatch("on_message_delete", message)
+        elif len(history) >= args.bulk_size and roll < args.edit_ratio + args.delete_ratio + args.bulk_ratio:
+            batch, live[channel.id] = history[:args.bulk_size], history[args.bulk_size:]
+            first_token = min(batch, key=lambda entry: entry[0].id)[1]
+            expected[("bulk", first_token)] = time.perf_counter()
+            counts["bulk"] += 1
+            bot.dispatch("on_raw_bulk_message_delete", types.SimpleNamespace(
+                message_ids={message.id for message, _ in batch}, channel_id=channel.id,
+                guild_id=GUILD_ID, cached_messages=[]
+            ))
+        else:
+            token = next(tokens)
+            message_id = next(ids)
+            attachments = []
+            if args.attachment_kb and rng.random() < args.attachment_ratio:
+                size = args.attachment_kb * 1024
+                attachments.append(Attachment(message_id, f"file-{message_id}.bin", f"{base_url}/cdn/{size}/file-{message_id}.bin", size))
+            message = Message(message_id, channel, rng.choice(authors), new_content(token), attachments)
+            history.append((message, token))
+            expected[("message", token)] = time.perf_counter()
+            counts["message"] += 1
+            bot.dispatch("on_message", message)
+    dispatched_at = time.perf_counter()
+    while bot.pending:
+        await asyncio.gather(*list(bot.pending), return_exceptions=True)
+    handled_at = time.perf_counter()
+    return start, dispatched_at, handled_at, expected, counts
+
+
+# --- pre-index / pre-template baselines ---
+# Copies of what the script did per event before the routing index and embed templates, kept so the
+# microbenchmarks always report a before/after pair from the same run.
+
+def scan_matched_source(config, channel_id, server_id, category_id=None, parent_channel_id=None):
+    for source in config.get("sources", []):
+        if source["type"] == "thread" and source["id"] == channel_id:
+            return source
+        if source["type"] == "channel" and source["id"] == channel_id:
+            return source
+        if source["type"] == "channel" and parent_channel_id and source["id"] == parent_channel_id:
+            return source
+        if source["type"] == "category" and category_id and source["id"] == category_id and source.get("server_id") == server_id:
+            return source
+        if source["type"] == "server" and source["id"] == server_id:
+            return source
+    return None
+
+
+def scan_route(scope, config, channel, guild):
+    channel_id, parent_channel_id, category_id = scope["get_channel_context"](channel)
+    if channel_id in {s["destination_channel_id"] for s in config.get("sources", []) if s.get("destination_channel_id")}:
+        return None
+    return scan_matched_source(config, channel_id, str(guild.id) if guild else None, category_id, parent_channel_id)
+
+
+def untemplated_message_embed(scope, message):
+    theme_color, theme_small_image, theme_large_image = scope["get_theme_values"]()
+    channel_name = scope["get_channel_display_name"](message.channel)
+    message_link = f"https://discord.com/channels/{message.guild.id if message.guild else '@me'}/{message.channel.id}/{message.id}"
+    content_text = message.content or None
+    embed = {
+        "title": f"#{channel_name}",
+        "description": content_text[:2000] if content_text else "*No content*",
+        "color": theme_color,
+        "author": {"name": message.author.name, "icon_url": message.author.avatar.url},
+        "fields": [
+            {"name": "Author", "value": f"<@{message.author.id}>", "inline": True},
+            {"name": "User ID", "value": str(message.author.id), "inline": True},
+            {"name": "Channel", "value": f"<#{message.channel.id}>", "inline": True},
+            {"name": "Message Link", "value": f"[Jump to Message]({message_link})", "inline": True},
+            {"name": "Sent", "value": scope["discord_ts"](message.created_at), "inline": False}
+        ]
+    }
+    if theme_small_image:
+        embed["thumbnail"] = {"url": theme_small_image}
+    if theme_large_image:
+        embed["image"] = {"url": theme_large_image}
+    server_name = message.guild.name if message.guild else "Direct Message"
+    avatar_url = message.guild.icon.url if message.guild and message.guild.icon else None
+    return embed, server_name, avatar_url
+
+
+def templated_message_embed(scope, message):
+    # Mirrors the embed log_message builds from channel_template().
+    template = scope["channel_template"](message.channel, message.guild)
+    content_text = message.content
+    embed = {
+        "title": template["titles"]["message"],
+        "description": content_text[:2000] if content_text else "*No content*",
+        "color": template["color"],
+        "author": {"name": message.author.name, "icon_url": message.author.avatar.url},
+        "fields": [
+            {"name": "Author", "value": f"<@{message.author.id}>", "inline": True},
+            {"name": "User ID", "value": str(message.author.id), "inline": True},
+            template["channel_field"],
+            {"name": "Message Link", "value": f"[Jump to Message]({template['link_prefix']}{message.id})", "inline": True},
+            {"name": "Sent", "value": scope["discord_ts"](message.created_at), "inline": False}
+        ],
+        **template["extras"]
+    }
+    return embed, template["server_name"], template["avatar_url"]
+
+
+def sweep_config(channel, size, hit):
+    sources = [
+        {"type": "channel", "id": str(3_000_000 + i), "server_id": str(GUILD_ID), "destination_channel_id": str(DEST_CHANNEL_ID)}
+        for i in range(size)
+    ]
+    if hit:
+        sources[-1]["id"] = str(channel.id)
+    return {"enabled": True, "sources": sources}
+
+
+async def microbenchmarks(bot, channels, guild, iterations, route_sizes):
+    log_message = bot.listeners["on_message"][0]
+    scope = closure_of(log_message)
+    get_routing = scope["get_routing"]
+    resolve_source = scope["resolve_source"]
+    channel_template = scope["channel_template"]
+    templates = closure_of(channel_template)["_templates"]
+    routing_scope = closure_of(get_routing)
+    helpers = script_scope(bot)
+    results = {}
+
+    def timed(name, func):
+        began = time.perf_counter()
+        for i in range(iterations):
+            func(i)
+        results[name] = (time.perf_counter() - began) / iterations * 1e6
+
+    routing = get_routing()
+    timed("route (memoized)", lambda i: resolve_source(channels[i % len(channels)], guild, routing))
+
+    def route_cold(i):
+        routing["memo"].clear()
+        resolve_source(channels[i % len(channels)], guild, routing)
+    timed("route (memo miss)", route_cold)
+
+    timed("embed template (cached)", lambda i: channel_template(channels[i % len(channels)], guild))
+
+    def template_cold(i):
+        templates.clear()
+        channel_template(channels[i % len(channels)], guild)
+    timed("embed template (rebuild)", template_cold)
+
+    message = Message(4_000_000_000, channels[0], User(434343, "embed"), "embed micro " * 20)
+    assert untemplated_message_embed(helpers, message) == templated_message_embed(helpers, message)
+    timed("message embed (pre-template)", lambda i: untemplated_message_embed(helpers, message))
+    timed("message embed (template)", lambda i: templated_message_embed(helpers, message))
+
+    # Worst cases for the old scan: the matching source is listed last, or nothing matches at all.
+    target = channels[0]
+    for size in route_sizes:
+        for hit in (True, False):
+            config = sweep_config(target, size, hit)
+            case = f"{size} sources, {'last' if hit else 'miss'}"
+            assert scan_route(helpers, config, target, guild) is (config["sources"][-1] if hit else None)
+            timed(f"route scan ({case})", lambda i: scan_route(helpers, config, target, guild))
+            routing_scope["build_routing"](config)
+            sweep = routing_scope["_routing"]
+            assert resolve_source(target, guild, sweep) is (config["sources"][-1] if hit else None)
+
+            def indexed_cold(i):
+                sweep["memo"].clear()
+                resolve_source(target, guild, sweep)
+            timed(f"route index ({case})", indexed_cold)
+    routing_scope["_routing"]["config"] = None
+
+    async def no_delivery(*args, **kwargs):
+        return None
+
+    author = User(424242, "micro")
+    messages = [Message(5_000_000_000 + i, channels[i % len(channels)], author, f"micro message {i}") for i in range(iterations)]
+    previous = replace_free_var(log_message, "deliver_to_source", no_delivery)
+    try:
+        began = time.perf_counter()
+        for message in messages:
+            await log_message(message)
+        results["on_message handler (no I/O)"] = (time.perf_counter() - began) / iterations * 1e6
+    finally:
+        replace_free_var(log_message, "deliver_to_source", previous)
+    return results
+
+
+async def run(args):
+    install_discord_stub()
+    loop = asyncio.get_running_loop()
+    executor = CountingExecutor(max_workers=args.executor_workers, thread_name_prefix="bench-executor")
+    loop.set_default_executor(executor)
+
+    server = WebhookStandIn(args.rate_limit, args.rate_window)
+    runner = web.AppRunner(server.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+
+    log = []
+    peak_threads = [threading.active_count()]
+
+    async def sample_threads():
+        while True:
+            peak_threads[0] = max(peak_threads[0], threading.active_count())
+            await asyncio.sleep(0.01)
+
+    with tempfile.TemporaryDirectory(prefix="channel-logger-bench-") as scripts_dir:
+        bot = Bot(loop)
+        guild, channels = build_world(bot, args.sources)
+        (Path(scripts_dir) / "json").mkdir()
+        install_theme(Path(scripts_dir) / "appdata")
+        config = build_config(args, base_url, channels)
+        (Path(scripts_dir) / "json" / "ChannelLoggerConf.json").write_text(json.dumps(config))
+        load_channel_logger(bot, scripts_dir, log)
+        await asyncio.sleep(0.3)
+
+        sampler = loop.create_task(sample_threads())
+        start, dispatched_at, handled_at, expected, counts = await replay(args, bot, base_url, channels)
+        deadline = time.perf_counter() + args.timeout
+        while any(key not in server.acked for key in expected) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.05)
+        sampler.cancel()
+
+        latencies = {}
+        missing = 0
+        for key, sent_at in expected.items():
+            acked_at = server.acked.get(key)
+            if acked_at is None:
+                missing += 1
+                continue
+            latencies.setdefault(key[0], []).append((acked_at - sent_at) * 1000)
+        all_latencies = [value for values in latencies.values() for value in values]
+        delivered_at = max((server.acked[key] for key in expected if key in server.acked), default=handled_at)
+
+        route_sizes = [int(size) for size in args.route_sizes.split(",") if size.strip()]
+        micro = await microbenchmarks(bot, channels, guild, args.micro_iterations, route_sizes) if args.micro_iterations else {}
+        await bot._channel_logger_shutdown()
+    await runner.cleanup()
+    executor.shutdown(wait=True)
+
+    errors = [text for level, text in log if level == "ERROR"]
+    return {
+        "events": args.events,
+        "event_mix": counts,
+        "sources": args.sources,
+        "dispatch_seconds": dispatched_at - start,
+        "handler_throughput_eps": args.events / max(handled_at - start, 1e-9),
+        "delivered_throughput_eps": (len(expected) - missing) / max(delivered_at - start, 1e-9),
+        "undelivered": missing,
+        "latency_ms": {
+            kind: {"p50": percentile(values, 0.5), "p99": percentile(values, 0.99), "max": max(values)}
+            for kind, values in sorted(latencies.items())
+        },
+        "latency_ms_all": {"p50": percentile(all_latencies, 0.5), "p99": percentile(all_latencies, 0.99)},
+        "webhook_requests": server.requests,
+        "webhook_429s": server.rate_limited,
+        "bytes_uploaded": server.bytes_received,
+        "executor": {"submitted": executor.submitted, "peak_concurrent": executor.peak_active, "threads_started": len(executor._threads)},
+        "peak_threads": peak_threads[0],
+        "peak_rss_mb": peak_rss_mb(),
+        "errors": len(errors),
+        "first_errors": errors[:5],
+        "microbenchmarks_us": micro
+    }
+
+
+def report(result):
+    mix = ", ".join(f"{n} {kind}" for kind, n in result["event_mix"].items())
+    print(f"events           {result['events']} ({mix}) across {result['sources']} sources")
+    print(f"handler          {result['handler_throughput_eps']:.0f} events/s (dispatch took {result['dispatch_seconds']:.2f}s)")
+    print(f"delivered        {result['delivered_throughput_eps']:.0f} events/s, {result['undelivered']} undelivered")
+    overall = result["latency_ms_all"]
+    if overall["p50"] is not None:
+        print(f"latency          p50 {overall['p50']:.1f} ms · p99 {overall['p99']:.1f} ms")
+    for kind, stats in result["latency_ms"].items():
+        print(f"  {kind:<14} p50 {stats['p50']:.1f} ms · p99 {stats['p99']:.1f} ms · max {stats['max']:.1f} ms")
+    print(f"webhook          {result['webhook_requests']} requests · {result['webhook_429s']} 429s · {result['bytes_uploaded'] / (1024 * 1024):.1f} MB uploaded")
+    ex = result["executor"]
+    print(f"executor         {ex['submitted']} jobs · peak {ex['peak_concurrent']} concurrent · {ex['threads_started']} threads started · peak {result['peak_threads']} process threads")
+    rss = result["peak_rss_mb"]
+    print(f"peak RSS         {rss:.1f} MB" if rss is not None else "peak RSS         n/a")
+    print(f"script errors    {result['errors']}")
+    for line in result["first_errors"]:
+        print(f"  {line[:160]}")
+    for name, micros in result["microbenchmarks_us"].items():
+        print(f"micro            {name:<36} {micros:.2f} us/op")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic Discord events through ChannelLogger.py against a local webhook stand-in.")
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--sources", type=int, default=10, help="channel sources, each with its own webhook")
+    parser.add_argument("--rate", type=float, default=0, help="events per second to dispatch, 0 for as fast as possible")
+    parser.add_argument("--edit-ratio", type=float, default=0.15)
+    parser.add_argument("--delete-ratio", type=float, default=0.1)
+    parser.add_argument("--bulk-ratio", type=float, default=0.01)
+    parser.add_argument("--bulk-size", type=int, default=20)
+    parser.add_argument("--content-words", type=int, default=20)
+    parser.add_argument("--attachment-kb", type=int, default=0, help="size of each attachment, 0 disables attachments")
+    parser.add_argument("--attachment-ratio", type=float, default=0.2, help="fraction of messages carrying an attachment")
+    parser.add_argument("--rate-limit", type=int, default=30, help="requests per webhook per window before 429s, 0 disables")
+    parser.add_argument("--rate-window", type=float, default=1.0)
+    parser.add_argument("--batch", action="store_true", help="enable batch_embeds")
+    parser.add_argument("--config", default="{}", help="JSON object merged into the logger config")
+    parser.add_argument("--executor-workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for deliveries after the last event")
+    parser.add_argument("--micro-iterations", type=int, default=20000, help="0 skips the routing/embed microbenchmarks")
+    parser.add_argument("--route-sizes", default="10,100,1000", help="source counts for the routing scan vs index comparison")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        report(result)
+
+
+if __name__ == "__main__":
+    main()